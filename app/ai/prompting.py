@@ -0,0 +1,43 @@
+"""Prompt-building helpers shared by the LLM skills.
+
+Providers cache the longest byte-identical prefix of a prompt, so every
+skill keeps its system prompt fully static and appends per-call variables
+(payload, today's date, …) at the very end of the user message. Inputs are
+serialised compactly to keep token counts low.
+"""
+
+import json
+import logging
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+
+def compact_json(value: Any) -> str:
+    """Serialise *value* as JSON without insignificant whitespace."""
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def build_user_message(*sections: tuple[str, str]) -> str:
+    """Join ``(label, body)`` sections into a user message.
+
+    Callers pass the most stable sections first and the most volatile
+    ones (e.g. today's date) last.
+    """
+    return "\n".join(f"{label}:\n{body}" for label, body in sections)
+
+
+def log_prompt_usage(skill: str, model_id: str, result: Any) -> None:
+    """Log prompt/cached token counts and time-to-first-token for one call."""
+    metrics = getattr(result, "metrics", None)
+    if metrics is None:
+        return
+    logger.info(
+        "%s model=%s input_tokens=%s cached_tokens=%s output_tokens=%s ttft=%s",
+        skill,
+        model_id,
+        getattr(metrics, "input_tokens", None),
+        getattr(metrics, "cache_read_tokens", None),
+        getattr(metrics, "output_tokens", None),
+        getattr(metrics, "time_to_first_token", None),
+    )
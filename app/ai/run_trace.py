@@ -0,0 +1,71 @@
+"""Per-run trace of the shift-offer workflow (stage timings, models used).
+
+``process_message`` opens a ``run_trace()``; the workflow and skills
+annotate the active trace through the module-level helpers, which are
+no-ops when no trace is active. The trace feeds the decision log.
+"""
+
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from app.ai.schemas import OfferExtraction
+
+
+@dataclass
+class RunTrace:
+    """What happened during one workflow run."""
+
+    stages_ms: dict[str, float] = field(default_factory=dict)
+    models: dict[str, str] = field(default_factory=dict)
+    fallbacks: set[str] = field(default_factory=set)
+    escalation: str | None = None
+    extraction: OfferExtraction | None = None
+
+
+_current: ContextVar[RunTrace | None] = ContextVar("run_trace", default=None)
+
+
+@contextmanager
+def run_trace() -> Iterator[RunTrace]:
+    """Activate a new RunTrace for the duration of the block."""
+    trace = RunTrace()
+    token = _current.set(trace)
+    try:
+        yield trace
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Time a workflow stage into the active trace."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace = _current.get()
+        if trace is not None:
+            trace.stages_ms[name] = (time.perf_counter() - started) * 1000
+
+
+def record_model(stage_name: str, model_id: str) -> None:
+    if (trace := _current.get()) is not None:
+        trace.models[stage_name] = model_id
+
+
+def record_fallback(stage_name: str) -> None:
+    if (trace := _current.get()) is not None:
+        trace.fallbacks.add(stage_name)
+
+
+def record_escalation(reason: str) -> None:
+    if (trace := _current.get()) is not None:
+        trace.escalation = reason
+
+
+def record_extraction(extraction: OfferExtraction) -> None:
+    if (trace := _current.get()) is not None:
+        trace.extraction = extraction
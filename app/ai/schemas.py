@@ -3,16 +3,23 @@
 from datetime import date, time
 from enum import Enum
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
+
+from app.common.phone import normalize_phone
 
 
 # ── Inbound ──────────────────────────────────────────────────────────────────
 
 class MessageIn(BaseModel):
     """Payload received from the WhatsApp webhook (simplified)."""
-    phone: str = Field(..., description="Sender phone number (E.164)")
+    phone: str = Field(..., description="Sender phone number (normalised to E.164)")
     text: str = Field(..., description="Raw message text")
 
+    @field_validator("phone")
+    @classmethod
+    def _normalize_phone(cls, value: str) -> str:
+        return normalize_phone(value)
+
 
 # ── Offer Extraction ─────────────────────────────────────────────────────────
 
@@ -35,6 +42,10 @@ class OfferExtraction(BaseModel):
     is_offer: bool = Field(..., description="True if the message is a shift offer")
     shifts: list[ShiftCandidate] = Field(default_factory=list)
     raw_summary: str | None = None
+    confidence: float = Field(
+        default=1.0, ge=0.0, le=1.0,
+        description="Model's self-reported confidence in this extraction",
+    )
 
 
 # ── Schedule Check ────────────────────────────────────────────────────────────
@@ -2,10 +2,10 @@
 
 import json
 import re
+from typing import TYPE_CHECKING
 
-from agno.agent import Agent
-from agno.models.openai import OpenAIChat
-
+from app.ai.prompting import build_user_message, compact_json, log_prompt_usage
+from app.ai.run_trace import record_fallback, record_model
 from app.ai.schemas import (
     ActionType,
     DecisionOut,
@@ -15,9 +15,16 @@ from app.ai.schemas import (
 from app.ai.skills.decision.prompt import SYSTEM_PROMPT
 from app.common.config import settings
 
+if TYPE_CHECKING:
+    from agno.agent import Agent
+
 
-def _build_agent() -> Agent:
+def _build_agent() -> "Agent":
     """Create a reusable Agno Agent for decision-making."""
+    # Imported lazily: agno/openai are slow to import and not needed at boot
+    from agno.agent import Agent
+    from agno.models.openai import OpenAIChat
+
     return Agent(
         name="decision",
         model=OpenAIChat(
@@ -36,9 +43,8 @@ def _parse_fallback(text: str, validations: list[ShiftValidation]) -> DecisionOu
     match = re.search(r"\{.*\}", text, re.DOTALL)
     if match:
         data = json.loads(match.group())
-        # Ensure validations are carried over
-        if "validations" not in data or not data["validations"]:
-            data["validations"] = [v.model_dump() for v in validations]
+        # Always carry over the deterministic validations
+        data["validations"] = [v.model_dump() for v in validations]
         return DecisionOut.model_validate(data)
 
     # Absolute fallback
@@ -53,14 +59,19 @@ def _build_user_message(
     extraction: OfferExtraction,
     validations: list[ShiftValidation],
 ) -> str:
-    """Compose the user message sent to the decision agent."""
-    ext_json = extraction.model_dump_json(indent=2)
-    val_json = json.dumps(
-        [v.model_dump(mode="json") for v in validations], indent=2, default=str,
-    )
-    return (
-        f"Offer extraction:\n{ext_json}\n\n"
-        f"Schedule validations:\n{val_json}"
+    """Compose the user message sent to the decision agent.
+
+    Validations reference shifts by index instead of repeating them, since
+    ``run_schedule_check`` returns one validation per extracted shift, in
+    order.
+    """
+    val_data = [
+        {"shift_index": i, "ok": v.ok, "reason": v.reason}
+        for i, v in enumerate(validations)
+    ]
+    return build_user_message(
+        ("Offer extraction", extraction.model_dump_json(exclude={"confidence"})),
+        ("Schedule validations", compact_json(val_data)),
     )
 
 
@@ -74,26 +85,31 @@ async def run_decision(
     """
     agent = _build_agent()
     user_msg = _build_user_message(extraction, validations)
+    record_model("decision", settings.OPENAI_MODEL)
 
     try:
-        result = agent.run(user_msg)
+        result = await agent.arun(user_msg)
+        log_prompt_usage("decision", settings.OPENAI_MODEL, result)
         content = result.content
 
         if isinstance(content, DecisionOut):
-            # Ensure validations are attached
-            if not content.validations:
-                content.validations = validations
+            # The prompt only carries shift indexes, so always attach the
+            # deterministic validations instead of the model's echo.
+            content.validations = validations
             return content
 
         if isinstance(content, dict):
-            if "validations" not in content or not content["validations"]:
-                content["validations"] = [v.model_dump() for v in validations]
+            content["validations"] = [v.model_dump() for v in validations]
             return DecisionOut.model_validate(content)
 
         return _parse_fallback(str(content), validations)
 
     except Exception:
+        record_fallback("decision")
         try:
+            from agno.agent import Agent
+            from agno.models.openai import OpenAIChat
+
             plain_agent = Agent(
                 name="decision_fallback",
                 model=OpenAIChat(
@@ -103,7 +119,8 @@ async def run_decision(
                 instructions=[SYSTEM_PROMPT],
                 markdown=False,
             )
-            result = plain_agent.run(user_msg)
+            result = await plain_agent.arun(user_msg)
+            log_prompt_usage("decision_fallback", settings.OPENAI_MODEL, result)
             return _parse_fallback(str(result.content), validations)
         except Exception:
             return DecisionOut(
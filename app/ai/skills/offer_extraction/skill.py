@@ -1,79 +1,207 @@
-"""Offer extraction skill – uses Agno Agent + OpenAI to parse shift offers."""
+"""Offer extraction skill – uses Agno Agent + OpenAI to parse shift offers.
+
+Runs as a two-tier cascade: a cheap, fast model handles the common case
+(not-an-offer, single simple shift) and the message is escalated to the
+strong model only when the fast tier's answer trips one of the configured
+escalation metrics (see ``OFFER_CASCADE_*`` in settings).
+"""
 
 import json
+import logging
 import re
-from typing import Optional
-
-from agno.agent import Agent
-from agno.models.openai import OpenAIChat
+from datetime import date
+from typing import TYPE_CHECKING, Optional
 
+from app.ai.prompting import build_user_message, log_prompt_usage
+from app.ai.run_trace import record_escalation, record_fallback, record_model
 from app.ai.schemas import OfferExtraction
-from app.ai.skills.offer_extraction.prompt import get_system_prompt
+from app.ai.skills.offer_extraction.prompt import SYSTEM_PROMPT
 from app.common.config import settings
 
+if TYPE_CHECKING:
+    from agno.agent import Agent
+
+logger = logging.getLogger(__name__)
+
+# Escalation metrics understood by OFFER_CASCADE_ESCALATE_ON
+LOW_CONFIDENCE = "low_confidence"
+MULTI_SHIFT = "multi_shift"
+MISSING_SHIFTS = "missing_shifts"
+# Not configurable: an unparseable fast-tier answer always escalates
+SCHEMA_ERROR = "schema_error"
+
 
-def _build_agent() -> Agent:
+def _strong_model() -> str:
+    """Model id for the strong tier (falls back to OPENAI_MODEL)."""
+    return settings.OFFER_STRONG_MODEL or settings.OPENAI_MODEL
+
+
+def _escalate_on() -> set[str]:
+    """Parse the comma-separated OFFER_CASCADE_ESCALATE_ON setting."""
+    return {
+        item.strip()
+        for item in settings.OFFER_CASCADE_ESCALATE_ON.split(",")
+        if item.strip()
+    }
+
+
+def _build_agent(model_id: Optional[str] = None) -> "Agent":
     """Create a reusable Agno Agent for offer extraction."""
+    # Imported lazily: agno/openai are slow to import and not needed at boot
+    from agno.agent import Agent
+    from agno.models.openai import OpenAIChat
+
     return Agent(
         name="offer_extraction",
         model=OpenAIChat(
-            id=settings.OPENAI_MODEL,
+            id=model_id or _strong_model(),
             api_key=settings.OPENAI_API_KEY,
         ),
-        instructions=[get_system_prompt()],
+        instructions=[SYSTEM_PROMPT],
         output_schema=OfferExtraction,
         structured_outputs=True,
         markdown=False,
     )
 
 
-def _parse_fallback(text: str) -> OfferExtraction:
-    """Fallback: extract JSON from raw text and validate with Pydantic."""
+def _build_user_message(message_text: str) -> str:
+    """Compose the user message: payload first, today's date last."""
+    return build_user_message(
+        ("Message", message_text),
+        ("Today's date", date.today().isoformat()),
+    )
+
+
+def _parse_fallback(text: str, strict: bool = False) -> OfferExtraction:
+    """Fallback: extract JSON from raw text and validate with Pydantic.
+
+    Without a JSON block the answer is "not an offer", unless *strict*,
+    in which case ValueError is raised.
+    """
     # Try to find a JSON block in the response
     match = re.search(r"\{.*\}", text, re.DOTALL)
     if match:
         data = json.loads(match.group())
         return OfferExtraction.model_validate(data)
+    if strict:
+        raise ValueError("no JSON object in model output")
     # Nothing found → not an offer
     return OfferExtraction(is_offer=False, shifts=[], raw_summary=None)
 
 
-async def run_offer_extraction(message_text: str) -> OfferExtraction:
-    """Execute the offer extraction skill.
+def _coerce(content: object, strict: bool = False) -> OfferExtraction:
+    """Turn an agent's ``content`` into an OfferExtraction (may raise).
 
-    Tries structured output via Agno Agent first.
-    Falls back to manual JSON parsing if needed.
+    *strict* makes output without any JSON an error (see ``_parse_fallback``).
     """
-    agent = _build_agent()
+    # If Agent returned a parsed Pydantic model directly
+    if isinstance(content, OfferExtraction):
+        return content
+
+    # If it returned a dict (some versions do this)
+    if isinstance(content, dict):
+        return OfferExtraction.model_validate(content)
+
+    # Otherwise treat as string and parse
+    return _parse_fallback(str(content), strict=strict)
 
+
+def _escalation_reason(extraction: OfferExtraction) -> Optional[str]:
+    """Return the first escalation metric tripped by a fast-tier answer."""
+    metrics = _escalate_on()
+
+    if LOW_CONFIDENCE in metrics and (
+        # An omitted confidence would default to 1.0 – don't trust it
+        "confidence" not in extraction.model_fields_set
+        or extraction.confidence < settings.OFFER_CASCADE_MIN_CONFIDENCE
+    ):
+        return LOW_CONFIDENCE
+    if (
+        MULTI_SHIFT in metrics
+        and len(extraction.shifts) > settings.OFFER_CASCADE_MAX_FAST_SHIFTS
+    ):
+        return MULTI_SHIFT
+    if MISSING_SHIFTS in metrics and extraction.is_offer and not extraction.shifts:
+        return MISSING_SHIFTS
+    return None
+
+
+async def _run_fast_tier(user_msg: str) -> tuple[Optional[OfferExtraction], str]:
+    """Run the fast tier.
+
+    Unlike the strong tier there is no silent "not an offer" fallback:
+    output that is not valid OfferExtraction JSON (or a failed call)
+    escalates with ``schema_error``.
+
+    Returns:
+        ``(extraction, "")`` when the answer can be used as-is, or
+        ``(None, reason)`` when the message must be escalated.
+    """
     try:
-        result = agent.run(message_text)
-        content = result.content
+        result = await _build_agent(settings.OFFER_FAST_MODEL).arun(user_msg)
+        log_prompt_usage("offer_extraction", settings.OFFER_FAST_MODEL, result)
+        extraction = _coerce(result.content, strict=True)
+    except Exception:
+        return None, SCHEMA_ERROR
 
-        # If Agent returned a parsed Pydantic model directly
-        if isinstance(content, OfferExtraction):
-            return content
+    reason = _escalation_reason(extraction)
+    if reason:
+        return None, reason
+    return extraction, ""
 
-        # If it returned a dict (some versions do this)
-        if isinstance(content, dict):
-            return OfferExtraction.model_validate(content)
 
-        # Otherwise treat as string and parse
-        return _parse_fallback(str(content))
+async def _run_strong_tier(user_msg: str) -> OfferExtraction:
+    """Run the strong tier with structured output, then plain-text fallback."""
+    agent = _build_agent(_strong_model())
+    record_model("offer_extraction", _strong_model())
+
+    try:
+        result = await agent.arun(user_msg)
+        log_prompt_usage("offer_extraction", _strong_model(), result)
+        return _coerce(result.content)
 
     except Exception:
         # Last resort: try without output_schema
+        record_fallback("offer_extraction")
         try:
+            from agno.agent import Agent
+            from agno.models.openai import OpenAIChat
+
             plain_agent = Agent(
                 name="offer_extraction_fallback",
                 model=OpenAIChat(
-                    id=settings.OPENAI_MODEL,
+                    id=_strong_model(),
                     api_key=settings.OPENAI_API_KEY,
                 ),
-                instructions=[get_system_prompt()],
+                instructions=[SYSTEM_PROMPT],
                 markdown=False,
             )
-            result = plain_agent.run(message_text)
+            result = await plain_agent.arun(user_msg)
+            log_prompt_usage("offer_extraction_fallback", _strong_model(), result)
             return _parse_fallback(str(result.content))
         except Exception:
             return OfferExtraction(is_offer=False, shifts=[], raw_summary=None)
+
+
+async def run_offer_extraction(message_text: str) -> OfferExtraction:
+    """Execute the offer extraction skill.
+
+    When the cascade is enabled the fast tier answers first; the strong
+    tier is only called if the fast answer is escalated. The strong tier
+    tries structured output via Agno Agent first and falls back to manual
+    JSON parsing if needed.
+    """
+    user_msg = _build_user_message(message_text)
+
+    if settings.OFFER_CASCADE_ENABLED and settings.OFFER_FAST_MODEL != _strong_model():
+        extraction, reason = await _run_fast_tier(user_msg)
+        if extraction is not None:
+            record_model("offer_extraction", settings.OFFER_FAST_MODEL)
+            logger.debug("offer_extraction answered by fast tier (%s)", settings.OFFER_FAST_MODEL)
+            return extraction
+        record_escalation(reason)
+        logger.info(
+            "offer_extraction escalated to %s (reason=%s)", _strong_model(), reason,
+        )
+
+    return await _run_strong_tier(user_msg)
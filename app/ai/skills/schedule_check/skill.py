@@ -1,12 +1,12 @@
 """Schedule check skill – deterministic, no LLM.
 
-Delegates to the schedule_tool for each ShiftCandidate.
+Delegates to the schedule_tool, which checks all candidates together.
 """
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.ai.schemas import ShiftCandidate, ShiftValidation
-from app.ai.tools.schedule_tool import check_shift
+from app.ai.tools.schedule_tool import check_shifts
 
 
 async def run_schedule_check(
@@ -15,8 +15,4 @@ async def run_schedule_check(
     candidates: list[ShiftCandidate],
 ) -> list[ShiftValidation]:
     """Validate every candidate shift against the doctor's schedule."""
-    results: list[ShiftValidation] = []
-    for candidate in candidates:
-        validation = await check_shift(db, doctor_id, candidate)
-        results.append(validation)
-    return results
+    return await check_shifts(db, doctor_id, candidates)
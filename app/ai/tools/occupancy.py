@@ -0,0 +1,234 @@
+"""Weekly occupancy bitmaps – O(1) checks against weekly schedule rules.
+
+A doctor's ``AvailabilityRule`` and ``RecurringBusyRule`` rows are weekly
+patterns, so they are packed once into Python ints with one bit per
+5-minute slot of the week (bit 0 = Monday 00:00). A shift becomes a mask
+over the same slots and the weekly part of the check is a couple of bitwise
+operations. Masks wrap from Sunday back to Monday, so shifts crossing
+midnight (or the end of the week) need no special casing; ``day_segments``
+splits a shift per calendar day when each day must be judged on its own.
+
+Rules whose ``end_time`` is not after ``start_time`` run into the next
+weekday (e.g. Monday 19:00–07:00 covers Monday night until Tuesday 07:00).
+
+Times off the 5-minute grid only partly fill their boundary slot, so the
+masks alone would reject a 07:03 shift against availability from 07:03 (or
+report a busy block from 07:03 as hitting a shift ending then). The masks
+answer every clear-cut case; only when they see a conflict are the exact
+minute ranges compared.
+"""
+
+from bisect import bisect_right
+from dataclasses import dataclass
+from datetime import datetime, time, timedelta
+
+from sqlalchemy import Select, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.common.cache import MISSING, LRUCache
+from app.common.config import settings
+from app.db.models import AvailabilityRule, RecurringBusyRule
+
+SLOT_MINUTES = 5
+SLOTS_PER_DAY = 24 * 60 // SLOT_MINUTES
+SLOTS_PER_WEEK = 7 * SLOTS_PER_DAY
+
+_MINUTES_PER_DAY = 24 * 60
+_MINUTES_PER_WEEK = 7 * _MINUTES_PER_DAY
+_WEEK_MASK = (1 << SLOTS_PER_WEEK) - 1
+_DAY_MASK = (1 << SLOTS_PER_DAY) - 1
+
+
+def _minute_of_week(weekday: int, t: time) -> int:
+    return weekday * _MINUTES_PER_DAY + t.hour * 60 + t.minute
+
+
+def _slot_mask(start_min: int, end_min: int, *, inner: bool) -> int:
+    """Mask of the slots for minutes ``[start_min, end_min)`` of the week.
+
+    ``inner=True`` keeps only slots fully inside the range (used for
+    availability, so coverage is never overstated); otherwise every slot
+    the range touches is set (used for shifts and busy blocks, so conflicts
+    are never missed). ``end_min`` may run past the end of the week.
+    """
+    if inner:
+        first = -(-start_min // SLOT_MINUTES)
+        last = end_min // SLOT_MINUTES
+    else:
+        first = start_min // SLOT_MINUTES
+        last = -(-end_min // SLOT_MINUTES)
+
+    count = last - first
+    if count <= 0:
+        return 0
+    if count >= SLOTS_PER_WEEK:
+        return _WEEK_MASK
+
+    bits = ((1 << count) - 1) << (first % SLOTS_PER_WEEK)
+    return (bits | (bits >> SLOTS_PER_WEEK)) & _WEEK_MASK
+
+
+def _week_parts(start_min: int, end_min: int) -> tuple[tuple[int, int], ...]:
+    """Split minutes ``[start_min, end_min)`` where they wrap past Sunday 24:00."""
+    if end_min - start_min >= _MINUTES_PER_WEEK:
+        return ((0, _MINUTES_PER_WEEK),)
+    start = start_min % _MINUTES_PER_WEEK
+    end = start + (end_min - start_min)
+    if end <= _MINUTES_PER_WEEK:
+        return ((start, end),)
+    return ((start, _MINUTES_PER_WEEK), (0, end - _MINUTES_PER_WEEK))
+
+
+def _merge(parts: list[tuple[int, int]]) -> tuple[tuple[int, int], ...]:
+    """Sorted, disjoint, non-touching union of minute ranges."""
+    merged: list[tuple[int, int]] = []
+    for start, end in sorted(parts):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return tuple(merged)
+
+
+def rule_span(weekday: int, start: time, end: time) -> tuple[int, int]:
+    """Minutes of the week a weekly rule spans; ``end <= start`` runs into the next weekday."""
+    start_min = _minute_of_week(weekday, start)
+    end_min = _minute_of_week(weekday, end)
+    if end_min <= start_min:
+        end_min += _MINUTES_PER_DAY
+    return start_min, end_min
+
+
+def rule_mask(weekday: int, start: time, end: time, *, inner: bool = False) -> int:
+    """Mask for a weekly rule; ``end <= start`` runs into the next weekday."""
+    return _slot_mask(*rule_span(weekday, start, end), inner=inner)
+
+
+def shift_span(start_dt: datetime, end_dt: datetime) -> tuple[int, int]:
+    """Minutes of the week ``[start_dt, end_dt)`` spans (end may run past the week)."""
+    start_min = _minute_of_week(start_dt.weekday(), start_dt.time())
+    duration_min = -(-int((end_dt - start_dt).total_seconds()) // 60)
+    return start_min, start_min + duration_min
+
+
+def day_segments(start_dt: datetime, end_dt: datetime) -> list[tuple[datetime, datetime]]:
+    """Split ``[start_dt, end_dt)`` at midnight into per-calendar-day pieces."""
+    segments: list[tuple[datetime, datetime]] = []
+    cursor = start_dt
+    while cursor < end_dt:
+        midnight = datetime.combine(cursor.date() + timedelta(days=1), time())
+        segment_end = min(midnight, end_dt)
+        segments.append((cursor, segment_end))
+        cursor = segment_end
+    return segments
+
+
+@dataclass(frozen=True)
+class WeeklyOccupancy:
+    """Precomputed weekly masks (and exact minute ranges) for one doctor."""
+
+    available: int = 0
+    busy: int = 0
+    # Merged availability minute ranges – only searched when the mask says no
+    available_ranges: tuple[tuple[int, int], ...] = ()
+    # (mask, label, minute ranges) per recurring rule – only scanned when
+    # ``busy`` overlaps
+    busy_rules: tuple[tuple[int, str, tuple[tuple[int, int], ...]], ...] = ()
+
+    def has_availability(self, weekday: int) -> bool:
+        """True if any availability starts or runs into *weekday*."""
+        return bool((self.available >> (weekday * SLOTS_PER_DAY)) & _DAY_MASK)
+
+    def covers(self, start_min: int, end_min: int) -> bool:
+        """True if minutes ``[start_min, end_min)`` are inside availability."""
+        if not (_slot_mask(start_min, end_min, inner=False) & ~self.available):
+            return True
+        starts = [start for start, _ in self.available_ranges]
+        for start, end in _week_parts(start_min, end_min):
+            i = bisect_right(starts, start) - 1
+            if i < 0 or self.available_ranges[i][1] < end:
+                return False
+        return True
+
+    def conflict(self, start_min: int, end_min: int) -> str | None:
+        """Label of the first recurring rule overlapping the minutes, if any."""
+        mask = _slot_mask(start_min, end_min, inner=False)
+        if not (mask & self.busy):
+            return None
+        parts = _week_parts(start_min, end_min)
+        for rule_bits, label, rule_parts in self.busy_rules:
+            if rule_bits & mask and any(
+                start < rule_end and rule_start < end
+                for start, end in parts
+                for rule_start, rule_end in rule_parts
+            ):
+                return label
+        return None
+
+
+def build_weekly_occupancy(
+    availability: list[AvailabilityRule],
+    recurring_busy: list[RecurringBusyRule],
+) -> WeeklyOccupancy:
+    """Pack a doctor's weekly rules into a WeeklyOccupancy."""
+    available = 0
+    available_parts: list[tuple[int, int]] = []
+    for rule in availability:
+        span = rule_span(rule.weekday, rule.start_time, rule.end_time)
+        available |= _slot_mask(*span, inner=True)
+        available_parts.extend(_week_parts(*span))
+
+    busy = 0
+    busy_rules: list[tuple[int, str, tuple[tuple[int, int], ...]]] = []
+    for rule in recurring_busy:
+        span = rule_span(rule.weekday, rule.start_time, rule.end_time)
+        bits = _slot_mask(*span, inner=False)
+        busy |= bits
+        busy_rules.append((bits, rule.label or "recurring busy", _week_parts(*span)))
+
+    return WeeklyOccupancy(
+        available=available,
+        busy=busy,
+        available_ranges=_merge(available_parts),
+        busy_rules=tuple(busy_rules),
+    )
+
+
+def availability_query(doctor_id: int) -> Select:
+    """All AvailabilityRules of a doctor."""
+    return select(AvailabilityRule).where(AvailabilityRule.doctor_id == doctor_id)
+
+
+def recurring_busy_query(doctor_id: int) -> Select:
+    """All RecurringBusyRules of a doctor."""
+    return select(RecurringBusyRule).where(RecurringBusyRule.doctor_id == doctor_id)
+
+
+# doctor_id → WeeklyOccupancy, rebuilt lazily after invalidation
+_occupancy_cache: LRUCache[int, WeeklyOccupancy] = LRUCache(
+    settings.OCCUPANCY_CACHE_SIZE, settings.OCCUPANCY_CACHE_TTL_SECONDS,
+)
+# Invalidations per doctor, so a build that raced one is not cached
+_generations: dict[int, int] = {}
+
+
+async def get_weekly_occupancy(db: AsyncSession, doctor_id: int) -> WeeklyOccupancy:
+    """Return the cached WeeklyOccupancy for a doctor, building it if needed."""
+    cached = _occupancy_cache.get(doctor_id)
+    if cached is not MISSING:
+        return cached
+
+    generation = _generations.get(doctor_id, 0)
+    availability = (await db.execute(availability_query(doctor_id))).scalars().all()
+    recurring_busy = (await db.execute(recurring_busy_query(doctor_id))).scalars().all()
+
+    occupancy = build_weekly_occupancy(list(availability), list(recurring_busy))
+    if _generations.get(doctor_id, 0) == generation:
+        _occupancy_cache.set(doctor_id, occupancy)
+    return occupancy
+
+
+def invalidate_weekly_occupancy(doctor_id: int) -> None:
+    """Drop a doctor's cached masks after their weekly rules change."""
+    _occupancy_cache.pop(doctor_id)
+    _generations[doctor_id] = _generations.get(doctor_id, 0) + 1
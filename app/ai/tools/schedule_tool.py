@@ -1,12 +1,19 @@
 """Deterministic schedule checker – no LLM involved."""
 
+from collections.abc import Sequence
 from datetime import datetime, time, timedelta
 
-from sqlalchemy import select
+from sqlalchemy import Select, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.ai.schemas import ShiftCandidate, ShiftType, ShiftValidation
-from app.db.models import AvailabilityRule, BusySlot, RecurringBusyRule
+from app.ai.tools.occupancy import (
+    WeeklyOccupancy,
+    day_segments,
+    get_weekly_occupancy,
+    shift_span,
+)
+from app.db.models import BusySlot
 
 
 # Default start times per shift type
@@ -15,6 +22,11 @@ _SHIFT_DEFAULTS: dict[ShiftType, time] = {
     ShiftType.NOTURNO: time(19, 0),
 }
 
+_WEEKDAYS = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+
+# (start, end, minutes of the week) of one calendar day's piece of a shift
+_Segment = tuple[datetime, datetime, tuple[int, int]]
+
 
 def _to_naive(t: time) -> time:
     """Strip timezone info so all comparisons use naive times."""
@@ -30,93 +42,147 @@ def _resolve_start(candidate: ShiftCandidate) -> time:
     return _SHIFT_DEFAULTS[candidate.shift_type]
 
 
-async def check_shift(
-    db: AsyncSession,
-    doctor_id: int,
-    candidate: ShiftCandidate,
-) -> ShiftValidation:
-    """Check a single ShiftCandidate against the doctor's schedule.
+def busy_overlap_query(doctor_id: int, start_dt: datetime, end_dt: datetime) -> Select:
+    """BusySlots of a doctor overlapping ``[start_dt, end_dt)``, earliest first."""
+    return (
+        select(BusySlot)
+        .where(
+            BusySlot.doctor_id == doctor_id,
+            BusySlot.start_dt < end_dt,
+            BusySlot.end_dt > start_dt,
+        )
+        .order_by(BusySlot.start_dt)
+    )
 
-    Rules applied (in order):
-    1. Night shifts crossing midnight → reject with review note.
-    2. Must fall inside at least one AvailabilityRule window.
-    3. Must not overlap any BusySlot.
-    4. Must not overlap any RecurringBusyRule.
+
+def shift_window(candidate: ShiftCandidate) -> tuple[datetime, datetime]:
+    """Start and end of a candidate shift as naive datetimes."""
+    start_dt = datetime.combine(candidate.date, _resolve_start(candidate))
+    return start_dt, start_dt + timedelta(hours=candidate.duration_hours)
+
+
+def _day_label(segment_start: datetime) -> str:
+    return f"{_WEEKDAYS[segment_start.weekday()]} {segment_start:%d/%m}"
+
+
+def _segment_label(segment_start: datetime, segment_end: datetime) -> str:
+    end = "24:00" if segment_end.time() == time() else f"{segment_end:%H:%M}"
+    return f"{_day_label(segment_start)} {segment_start:%H:%M}–{end}"
+
+
+def _segments(start_dt: datetime, end_dt: datetime) -> list[_Segment]:
+    """Per-calendar-day pieces of a shift, each with its span of the week."""
+    return [
+        (segment_start, segment_end, shift_span(segment_start, segment_end))
+        for segment_start, segment_end in day_segments(start_dt, end_dt)
+    ]
+
+
+def _availability_reason(occupancy: WeeklyOccupancy, segments: list[_Segment]) -> str | None:
+    """Why a day's piece is not covered by that day's availability, if so.
+
+    A piece counts as covered when it is inside an availability window of
+    its own weekday or one from the day before running past midnight.
     """
-    start_time = _resolve_start(candidate)
-    duration = timedelta(hours=candidate.duration_hours)
-    shift_start_dt = datetime.combine(candidate.date, start_time)
-    shift_end_dt = shift_start_dt + duration
-
-    # Rule 1: night shift crossing midnight
-    if candidate.shift_type == ShiftType.NOTURNO and shift_end_dt.date() != candidate.date:
-        return ShiftValidation(
-            shift=candidate,
-            ok=False,
-            reason="shift crosses midnight (needs review)",
+    for segment_start, segment_end, span in segments:
+        if occupancy.covers(*span):
+            continue
+        if not occupancy.has_availability(segment_start.weekday()):
+            return f"no availability rule for {_day_label(segment_start)}"
+        return (
+            "shift outside availability window "
+            f"({_segment_label(segment_start, segment_end)})"
         )
+    return None
 
-    weekday = candidate.date.weekday()  # 0=Mon … 6=Sun
 
-    # Rule 2: availability window
-    avail_rows = (
-        await db.execute(
-            select(AvailabilityRule).where(
-                AvailabilityRule.doctor_id == doctor_id,
-                AvailabilityRule.weekday == weekday,
+def _recurring_reason(occupancy: WeeklyOccupancy, segments: list[_Segment]) -> str | None:
+    """The first recurring block hit by any day's piece, if any."""
+    for segment_start, segment_end, span in segments:
+        label = occupancy.conflict(*span)
+        if label is not None:
+            return (
+                f"conflicts with recurring block: {label} "
+                f"({_segment_label(segment_start, segment_end)})"
             )
-        )
-    ).scalars().all()
+    return None
 
-    if not avail_rows:
-        return ShiftValidation(
-            shift=candidate, ok=False, reason="no availability rule for this weekday"
-        )
 
-    covered = any(
-        r.start_time <= start_time and r.end_time >= shift_end_dt.time()
-        for r in avail_rows
-    )
-    if not covered:
-        return ShiftValidation(
-            shift=candidate, ok=False, reason="shift outside availability window"
-        )
+def _evaluate(
+    candidate: ShiftCandidate,
+    window: tuple[datetime, datetime],
+    occupancy: WeeklyOccupancy,
+    busy_slots: Sequence[BusySlot],
+) -> ShiftValidation:
+    start_dt, end_dt = window
+    segments = _segments(start_dt, end_dt)
 
-    # Rule 3: one-off busy slots
-    busy_rows = (
-        await db.execute(
-            select(BusySlot).where(
-                BusySlot.doctor_id == doctor_id,
-                BusySlot.start_dt < shift_end_dt,
-                BusySlot.end_dt > shift_start_dt,
+    # Rule 1: availability window, per day
+    reason = _availability_reason(occupancy, segments)
+    if reason is not None:
+        return ShiftValidation(shift=candidate, ok=False, reason=reason)
+
+    # Rule 2: one-off busy slots
+    for slot in busy_slots:
+        if slot.start_dt < end_dt and slot.end_dt > start_dt:
+            return ShiftValidation(
+                shift=candidate,
+                ok=False,
+                reason=f"conflicts with busy slot: {slot.reason or 'busy'}",
             )
-        )
-    ).scalars().all()
 
-    if busy_rows:
-        return ShiftValidation(
-            shift=candidate,
-            ok=False,
-            reason=f"conflicts with busy slot: {busy_rows[0].reason or 'busy'}",
-        )
+    # Rule 3: recurring busy rules, per day
+    reason = _recurring_reason(occupancy, segments)
+    if reason is not None:
+        return ShiftValidation(shift=candidate, ok=False, reason=reason)
+
+    return ShiftValidation(shift=candidate, ok=True)
+
+
+async def check_shifts(
+    db: AsyncSession,
+    doctor_id: int,
+    candidates: Sequence[ShiftCandidate],
+) -> list[ShiftValidation]:
+    """Check ShiftCandidates against the doctor's schedule.
+
+    Every shift is split into per-calendar-day segments, so overnight,
+    24h and weekend-spanning shifts are judged against each day's rules.
+    Rules applied (in order):
+    1. Each segment must fall inside that day's weekly availability.
+    2. The shift must not overlap any BusySlot.
+    3. No segment may overlap that day's RecurringBusyRules.
 
-    # Rule 4: recurring busy rules
-    rec_rows = (
+    Rules 1 and 3 are mask operations on the doctor's WeeklyOccupancy;
+    BusySlots for all candidates come from one range query.
+    """
+    if not candidates:
+        return []
+
+    occupancy = await get_weekly_occupancy(db, doctor_id)
+
+    windows = [shift_window(candidate) for candidate in candidates]
+    busy_slots = (
         await db.execute(
-            select(RecurringBusyRule).where(
-                RecurringBusyRule.doctor_id == doctor_id,
-                RecurringBusyRule.weekday == weekday,
+            busy_overlap_query(
+                doctor_id,
+                min(start for start, _ in windows),
+                max(end for _, end in windows),
             )
         )
     ).scalars().all()
 
-    for rule in rec_rows:
-        # Check time overlap
-        if rule.start_time < shift_end_dt.time() and rule.end_time > start_time:
-            return ShiftValidation(
-                shift=candidate,
-                ok=False,
-                reason=f"conflicts with recurring block: {rule.label or 'recurring busy'}",
-            )
+    return [
+        _evaluate(candidate, window, occupancy, busy_slots)
+        for candidate, window in zip(candidates, windows)
+    ]
 
-    return ShiftValidation(shift=candidate, ok=True)
+
+async def check_shift(
+    db: AsyncSession,
+    doctor_id: int,
+    candidate: ShiftCandidate,
+) -> ShiftValidation:
+    """Check a single ShiftCandidate (see ``check_shifts``)."""
+    (validation,) = await check_shifts(db, doctor_id, [candidate])
+    return validation
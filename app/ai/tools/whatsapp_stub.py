@@ -0,0 +1,44 @@
+"""Local stand-in for the WhatsApp Cloud API messages endpoint.
+
+Run it and point the sender at it::
+
+    uv run uvicorn app.ai.tools.whatsapp_stub:app --port 9000
+    WHATSAPP_API_URL=http://localhost:9000 WHATSAPP_PHONE_NUMBER_ID=stub ...
+
+``STUB_FAILURE_RATE`` (0–1) makes that share of requests answer 503, to
+exercise retries; ``STUB_LATENCY_MS`` adds a fixed delay.
+"""
+
+import asyncio
+import itertools
+import os
+import random
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+
+app = FastAPI(title="WhatsApp stub")
+
+_ids = itertools.count(1)
+_received: list[dict] = []
+
+
+@app.post("/{phone_number_id}/messages")
+async def send(phone_number_id: str, payload: dict):
+    """Accept a message like the Cloud API would."""
+    await asyncio.sleep(float(os.getenv("STUB_LATENCY_MS", "0")) / 1000)
+    if random.random() < float(os.getenv("STUB_FAILURE_RATE", "0")):
+        return JSONResponse(status_code=503, content={"error": "stub failure"})
+
+    _received.append(payload)
+    return {
+        "messaging_product": "whatsapp",
+        "contacts": [{"input": payload.get("to"), "wa_id": payload.get("to")}],
+        "messages": [{"id": f"wamid.stub.{next(_ids)}"}],
+    }
+
+
+@app.get("/received")
+async def received():
+    """Messages accepted so far (for assertions in manual tests)."""
+    return {"count": len(_received), "messages": _received[-50:]}
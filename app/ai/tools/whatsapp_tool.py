@@ -1,18 +1,229 @@
-"""Placeholder for WhatsApp Cloud API integration.
+"""WhatsApp Cloud API sender.
 
-TODO: Implement actual WhatsApp message sending when ready.
+One shared keep-alive ``httpx.AsyncClient`` is used for every send, with
+token-bucket rate limits applied globally and per recipient. Callers on the
+request path should not send directly but enqueue into the outbox
+(``app.db.outbox``), whose dispatcher calls ``send_message``.
+
+Point ``WHATSAPP_API_URL`` at a local stub (``app.ai.tools.whatsapp_stub``)
+to exercise the whole path without Meta credentials.
 """
 
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass, field
+
+import httpx
+
+from app.common.config import settings
+
+
+class WhatsAppSendError(Exception):
+    """A send failed; ``retryable`` tells the outbox whether to try again."""
+
+    def __init__(self, message: str, retryable: bool) -> None:
+        super().__init__(message)
+        self.retryable = retryable
+
+
+# ── Rate limiting ────────────────────────────────────────────────────────────
+
+class TokenBucket:
+    """Classic token bucket: *rate* tokens per second, up to *burst*."""
+
+    def __init__(self, rate: float, burst: int) -> None:
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self) -> float:
+        """Take a token if available; else return seconds until one is."""
+        self._refill()
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0.0
+        return (1 - self._tokens) / self.rate
+
+    async def acquire(self) -> None:
+        """Wait until a token is available and take it."""
+        while (wait := self.try_acquire()) > 0:
+            await asyncio.sleep(wait)
+
+    @property
+    def idle(self) -> bool:
+        """True once the bucket has refilled completely."""
+        self._refill()
+        return self._tokens >= self.burst
+
+
+class RateLimiter:
+    """Global bucket plus one bucket per recipient number."""
+
+    def __init__(
+        self,
+        global_rate: float,
+        global_burst: int,
+        per_number_rate: float,
+        per_number_burst: int,
+    ) -> None:
+        self._global = TokenBucket(global_rate, global_burst)
+        self._per_number_rate = per_number_rate
+        self._per_number_burst = per_number_burst
+        self._numbers: dict[str, TokenBucket] = {}
+
+    def reserve_number(self, to: str) -> float:
+        """Take a per-number token; return the wait in seconds if none is left.
+
+        Not waiting here lets the dispatcher reschedule one chatty number
+        instead of blocking everyone behind it.
+        """
+        bucket = self._numbers.get(to)
+        if bucket is None:
+            if len(self._numbers) > 10_000:
+                self._numbers = {k: b for k, b in self._numbers.items() if not b.idle}
+            bucket = self._numbers[to] = TokenBucket(
+                self._per_number_rate, self._per_number_burst,
+            )
+        return bucket.try_acquire()
+
+    async def acquire_global(self) -> None:
+        await self._global.acquire()
+
+
+rate_limiter = RateLimiter(
+    settings.WHATSAPP_GLOBAL_RATE,
+    settings.WHATSAPP_GLOBAL_BURST,
+    settings.WHATSAPP_PER_NUMBER_RATE,
+    settings.WHATSAPP_PER_NUMBER_BURST,
+)
+
+
+# ── Metrics ──────────────────────────────────────────────────────────────────
+
+@dataclass
+class SendMetrics:
+    """In-process counters and recent latencies for outbound sends."""
+
+    sent: int = 0
+    failed: int = 0
+    retried: int = 0
+    rate_limited: int = 0
+    started: float = field(default_factory=time.monotonic)
+    latencies_ms: deque[float] = field(default_factory=lambda: deque(maxlen=1000))
+
+    def snapshot(self) -> dict:
+        latencies = sorted(self.latencies_ms)
+
+        def pct(p: float) -> float | None:
+            if not latencies:
+                return None
+            return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))], 1)
+
+        elapsed = time.monotonic() - self.started
+        return {
+            "sent": self.sent,
+            "failed": self.failed,
+            "retried": self.retried,
+            "rate_limited": self.rate_limited,
+            "throughput_per_s": round(self.sent / elapsed, 3) if elapsed else 0.0,
+            "latency_ms": {"p50": pct(0.5), "p95": pct(0.95), "p99": pct(0.99)},
+        }
+
+
+metrics = SendMetrics()
+
+
+# ── HTTP client ──────────────────────────────────────────────────────────────
+
+_client: httpx.AsyncClient | None = None
+
+
+def get_client() -> httpx.AsyncClient:
+    """Return the shared keep-alive client (created on first use)."""
+    global _client
+    if _client is None or _client.is_closed:
+        headers = {}
+        if settings.WHATSAPP_ACCESS_TOKEN:
+            headers["Authorization"] = f"Bearer {settings.WHATSAPP_ACCESS_TOKEN}"
+        _client = httpx.AsyncClient(
+            base_url=settings.WHATSAPP_API_URL.rstrip("/"),
+            headers=headers,
+            timeout=settings.WHATSAPP_TIMEOUT_SECONDS,
+            limits=httpx.Limits(
+                max_connections=settings.WHATSAPP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.WHATSAPP_MAX_CONNECTIONS,
+            ),
+        )
+    return _client
+
+
+async def close_client() -> None:
+    """Close the shared client (called on shutdown)."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
 
 async def send_message(to: str, text: str) -> dict:
     """Send a WhatsApp message to the given phone number.
 
+    Waits for the global rate limit; per-number limits are enforced by the
+    outbox dispatcher.
+
     Args:
         to: Recipient phone in E.164 format.
         text: Message body.
 
     Returns:
-        API response dict (stubbed for now).
+        API response dict.
+
+    Raises:
+        WhatsAppSendError: On transport errors, non-2xx responses or a 2xx
+            body that is not the expected JSON (not retryable: the message
+            may have gone out).
     """
-    # TODO: Integrate with WhatsApp Cloud API
-    return {"status": "not_implemented", "to": to, "text": text}
+    await rate_limiter.acquire_global()
+
+    payload = {
+        "messaging_product": "whatsapp",
+        "to": to.lstrip("+"),
+        "type": "text",
+        "text": {"body": text},
+    }
+    started = time.perf_counter()
+    try:
+        response = await get_client().post(
+            f"/{settings.WHATSAPP_PHONE_NUMBER_ID}/messages", json=payload,
+        )
+    except httpx.HTTPError as exc:
+        raise WhatsAppSendError(f"transport error: {exc!r}", retryable=True) from exc
+    finally:
+        metrics.latencies_ms.append((time.perf_counter() - started) * 1000)
+
+    if response.status_code >= 400:
+        retryable = response.status_code == 429 or response.status_code >= 500
+        raise WhatsAppSendError(
+            f"HTTP {response.status_code}: {response.text[:200]}", retryable=retryable,
+        )
+    try:
+        body = response.json()
+    except ValueError as exc:
+        raise WhatsAppSendError(
+            f"HTTP {response.status_code} with non-JSON body: {response.text[:200]}",
+            retryable=False,
+        ) from exc
+    messages = body.get("messages", []) if isinstance(body, dict) else None
+    if not isinstance(messages, list) or not all(isinstance(m, dict) for m in messages):
+        raise WhatsAppSendError(
+            f"HTTP {response.status_code} with unexpected body: {response.text[:200]}",
+            retryable=False,
+        )
+    return body
@@ -0,0 +1,32 @@
+"""LLM warm-up – imports the agent stack and opens the OpenAI connection.
+
+Agno shares one global HTTP client across models, so a single cheap call
+per configured model leaves a kept-alive connection for the first offer.
+"""
+
+import asyncio
+
+from app.common.config import settings
+
+
+def _warm_up_llm_sync() -> None:
+    from agno.agent import Agent  # noqa: F401 – pays the import cost now
+    from agno.models.openai import OpenAIChat
+
+    model_ids = {
+        settings.OPENAI_MODEL,
+        settings.OFFER_STRONG_MODEL or settings.OPENAI_MODEL,
+    }
+    if settings.OFFER_CASCADE_ENABLED:
+        model_ids.add(settings.OFFER_FAST_MODEL)
+
+    for model_id in model_ids:
+        model = OpenAIChat(id=model_id, api_key=settings.OPENAI_API_KEY)
+        model.get_client().models.retrieve(model_id)
+
+
+async def warm_up_llm() -> None:
+    """Warm the LLM client off the event loop (skipped without an API key)."""
+    if not settings.OPENAI_API_KEY:
+        return
+    await asyncio.to_thread(_warm_up_llm_sync)
@@ -8,6 +8,7 @@ Flow:
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.ai.run_trace import record_extraction, stage
 from app.ai.schemas import ActionType, DecisionOut, OfferExtraction
 from app.ai.skills.decision.skill import run_decision
 from app.ai.skills.offer_extraction.skill import run_offer_extraction
@@ -22,7 +23,8 @@ async def shift_offer_workflow(
     """Run the full shift-offer pipeline.
 
     Args:
-        db: Async database session.
+        db: Async database session; closed once the schedule check is done
+            (it reconnects if used again).
         doctor_id: ID of the doctor whose schedule to check.
         message_text: Raw WhatsApp message.
 
@@ -31,7 +33,9 @@ async def shift_offer_workflow(
     """
 
     # ── Step 1: Extract offer from message ───────────────────────────
-    extraction: OfferExtraction = await run_offer_extraction(message_text)
+    with stage("extraction"):
+        extraction: OfferExtraction = await run_offer_extraction(message_text)
+    record_extraction(extraction)
 
     if not extraction.is_offer:
         return DecisionOut(
@@ -51,9 +55,13 @@ async def shift_offer_workflow(
         )
 
     # ── Step 2: Check schedule (deterministic) ───────────────────────
-    validations = await run_schedule_check(db, doctor_id, extraction.shifts)
+    with stage("schedule_check"):
+        validations = await run_schedule_check(db, doctor_id, extraction.shifts)
+    # Hand the pooled connection back before the next LLM call
+    await db.close()
 
     # ── Step 3: Decision (LLM) ───────────────────────────────────────
-    decision = await run_decision(extraction, validations)
+    with stage("decision"):
+        decision = await run_decision(extraction, validations)
 
     return decision
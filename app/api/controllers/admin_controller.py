@@ -0,0 +1,161 @@
+"""Controllers for maintenance endpoints."""
+
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import case, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.ai.schemas import ActionType
+from app.ai.tools.whatsapp_tool import metrics as whatsapp_metrics
+from app.common.config import settings
+from app.db.decision_log import decision_log
+from app.db.invalidation import invalidation_bus
+from app.db.models import DecisionLog
+from app.db.outbox import dispatch_once, hold_dispatcher_lease
+from app.db.retention import archive_busy_slots
+from app.db.session import get_read_db
+
+router = APIRouter(prefix="/admin")
+
+
+@router.post("/retention/busy-slots")
+async def run_busy_slot_retention(
+    retention_days: int | None = Query(
+        default=None, ge=0, description="Defaults to BUSY_SLOT_RETENTION_DAYS",
+    ),
+):
+    """Archive busy slots that ended before the retention horizon."""
+    days = settings.BUSY_SLOT_RETENTION_DAYS if retention_days is None else retention_days
+    archived = await archive_busy_slots(retention_days=days)
+    return {"archived": archived, "retention_days": days}
+
+
+@router.get("/whatsapp/metrics")
+async def get_whatsapp_metrics():
+    """Outbound WhatsApp throughput, failures and send latency (this process)."""
+    return whatsapp_metrics.snapshot()
+
+
+@router.post("/whatsapp/dispatch")
+async def run_whatsapp_dispatch():
+    """Send one batch of due outbox messages now (dispatcher worker only)."""
+    if not await hold_dispatcher_lease():
+        return {"claimed": 0, "dispatcher": False}
+    return {"claimed": await dispatch_once(), "dispatcher": True}
+
+
+@router.get("/cache/invalidation")
+async def get_cache_invalidation():
+    """State of the cross-worker invalidation bus (this worker)."""
+    return invalidation_bus.snapshot()
+
+
+# ── Decision log ─────────────────────────────────────────────────────────────
+
+_STAGE_COLUMNS = {
+    "extraction": DecisionLog.extraction_ms,
+    "schedule_check": DecisionLog.schedule_ms,
+    "decision": DecisionLog.decision_ms,
+    "total": DecisionLog.total_ms,
+}
+
+
+def _window(stmt, since: datetime | None, until: datetime | None):
+    if since is not None:
+        stmt = stmt.where(DecisionLog.created_at >= since)
+    if until is not None:
+        stmt = stmt.where(DecisionLog.created_at < until)
+    return stmt
+
+
+def _rate(part: int | None, whole: int) -> float | None:
+    return round((part or 0) / whole, 4) if whole else None
+
+
+@router.get("/decisions/stats")
+async def get_decision_stats(
+    since: datetime | None = None,
+    until: datetime | None = None,
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Aggregated decision stats: accept/fallback/escalation rates and stage latency."""
+    totals = (
+        await db.execute(
+            _window(
+                select(
+                    func.count(),
+                    func.sum(case((DecisionLog.is_offer, 1), else_=0)),
+                    func.sum(case((DecisionLog.fallback, 1), else_=0)),
+                    func.sum(case((DecisionLog.escalation_reason.is_not(None), 1), else_=0)),
+                    *(func.avg(col) for col in _STAGE_COLUMNS.values()),
+                    *(func.max(col) for col in _STAGE_COLUMNS.values()),
+                ),
+                since, until,
+            )
+        )
+    ).one()
+    total, offers, fallbacks, escalations = totals[:4]
+    averages = totals[4:4 + len(_STAGE_COLUMNS)]
+    maxima = totals[4 + len(_STAGE_COLUMNS):]
+
+    by_action = dict(
+        (
+            await db.execute(
+                _window(
+                    select(DecisionLog.action, func.count()).group_by(DecisionLog.action),
+                    since, until,
+                )
+            )
+        ).all()
+    )
+
+    return {
+        "total": total,
+        "offers": offers or 0,
+        "by_action": by_action,
+        # Accept rate is over actual offers; the others over all messages
+        "accept_rate": _rate(by_action.get(ActionType.ACCEPT.value), offers or 0),
+        "fallback_rate": _rate(fallbacks, total),
+        "escalation_rate": _rate(escalations, total),
+        "latency_ms": {
+            name: {
+                "avg": round(avg, 1) if avg is not None else None,
+                "max": round(peak, 1) if peak is not None else None,
+            }
+            for name, avg, peak in zip(_STAGE_COLUMNS, averages, maxima)
+        },
+        "writer": {
+            "written": decision_log.written,
+            "dropped": decision_log.dropped,
+        },
+    }
+
+
+@router.get("/decisions")
+async def list_decisions(
+    before_id: int | None = Query(default=None, description="Return entries older than this id"),
+    limit: int = Query(default=50, ge=1, le=500),
+    doctor_id: int | None = None,
+    action: str | None = None,
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Most recent decision log entries, newest first (keyset on id)."""
+    stmt = select(DecisionLog).order_by(DecisionLog.id.desc()).limit(limit)
+    if before_id is not None:
+        stmt = stmt.where(DecisionLog.id < before_id)
+    if doctor_id is not None:
+        stmt = stmt.where(DecisionLog.doctor_id == doctor_id)
+    if action is not None:
+        stmt = stmt.where(DecisionLog.action == action)
+    rows = (await db.execute(stmt)).scalars().all()
+    return {
+        "items": [
+            {
+                column.key: getattr(row, column.key)
+                for column in DecisionLog.__table__.columns
+            }
+            for row in rows
+        ],
+        "next_before_id": rows[-1].id if len(rows) == limit else None,
+    }
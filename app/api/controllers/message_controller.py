@@ -1,70 +1,112 @@
 """Controller for the /message endpoint (AI motor)."""
 
-from datetime import datetime, timedelta
+import time
 
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.ai.schemas import ActionType, DecisionOut, MessageIn, ShiftType
+from app.ai.run_trace import run_trace
+from app.ai.schemas import ActionType, DecisionOut, MessageIn
+from app.ai.tools.schedule_tool import busy_overlap_query, shift_window
 from app.ai.workflows.shift_offer_workflow import shift_offer_workflow
-from app.db.models import BusySlot, Doctor
-from app.db.session import get_db
+from app.common.config import settings
+from app.db.decision_log import build_record, decision_log
+from app.db.doctors import bump_schedule_version, get_doctor_id_by_phone
+from app.db.models import BusySlot
+from app.db.outbox import enqueue_message
+from app.db.session import get_db, get_read_db
 
 router = APIRouter()
 
-# Default start times (same as schedule_tool)
-_SHIFT_DEFAULTS = {
-    ShiftType.DIURNO: datetime.min.time().replace(hour=7),
-    ShiftType.NOTURNO: datetime.min.time().replace(hour=19),
-}
+async def _book_accepted_shifts(
+    db: AsyncSession,
+    doctor_id: int,
+    decision: DecisionOut,
+) -> None:
+    """Create BusySlots for an accepted decision on the primary.
+
+    The schedule check may have read from a lagging replica, so every slot
+    is re-checked against the primary first. If any of them was taken in
+    the meantime nothing is booked and the decision becomes a reject.
+    """
+    slots: list[BusySlot] = []
+    conflicted = False
+
+    for v in decision.validations:
+        if not v.ok:
+            continue
+        shift = v.shift
+        start_dt, end_dt = shift_window(shift)
+
+        clash = (
+            await db.execute(busy_overlap_query(doctor_id, start_dt, end_dt).limit(1))
+        ).scalars().first()
+        if clash:
+            v.ok = False
+            v.reason = f"conflicts with busy slot: {clash.reason or 'busy'}"
+            conflicted = True
+            continue
+
+        slots.append(
+            BusySlot(
+                doctor_id=doctor_id,
+                start_dt=start_dt,
+                end_dt=end_dt,
+                reason=f"Plantão aceito – {shift.location or 'sem local'}",
+            )
+        )
+
+    if conflicted:
+        decision.action = ActionType.REJECT
+        decision.reply_text = (
+            "Obrigado pela oferta, mas esse horário acabou de ser ocupado "
+            "na minha agenda."
+        )
+        return
+
+    db.add_all(slots)
+    await bump_schedule_version(db, doctor_id)
+    await db.commit()
 
 
 @router.post("/message", response_model=DecisionOut)
 async def process_message(
     payload: MessageIn,
     db: AsyncSession = Depends(get_db),
+    read_db: AsyncSession = Depends(get_read_db),
 ) -> DecisionOut:
     """Receive a WhatsApp message and return action + suggested reply.
 
-    The endpoint does NOT send the reply automatically.
-    When the decision is 'accept', a BusySlot is created so the
+    The endpoint never sends the reply itself; with WHATSAPP_AUTO_REPLY
+    it is queued in the outbox for the background dispatcher.
+    Lookups and the schedule check use the read session, which is closed
+    around the LLM calls so no pooled connection waits on them; when the
+    decision is 'accept', a BusySlot is created on the primary so the
     same time slot won't be accepted twice.
     """
-    # Find doctor by phone
-    result = await db.execute(
-        select(Doctor).where(Doctor.phone == payload.phone)
-    )
-    doctor = result.scalars().first()
+    started = time.perf_counter()
 
-    if not doctor:
+    # Find doctor by phone (cached); don't hold a connection through extraction
+    doctor_id = await get_doctor_id_by_phone(read_db, payload.phone)
+    await read_db.close()
+
+    if doctor_id is None:
         raise HTTPException(status_code=404, detail="Doctor not found")
 
-    decision = await shift_offer_workflow(db, doctor.id, payload.text)
+    with run_trace() as trace:
+        decision = await shift_offer_workflow(read_db, doctor_id, payload.text)
 
     # Auto-create BusySlot for accepted shifts to avoid double-booking
     if decision.action == ActionType.ACCEPT:
-        for v in decision.validations:
-            if not v.ok:
-                continue
-            shift = v.shift
-            start_time = shift.start_time or _SHIFT_DEFAULTS.get(shift.shift_type)
-            # Strip timezone if present
-            if start_time and start_time.tzinfo:
-                start_time = start_time.replace(tzinfo=None)
-
-            start_dt = datetime.combine(shift.date, start_time)
-            end_dt = start_dt + timedelta(hours=shift.duration_hours)
-
-            busy = BusySlot(
-                doctor_id=doctor.id,
-                start_dt=start_dt,
-                end_dt=end_dt,
-                reason=f"Plantão aceito – {shift.location or 'sem local'}",
-            )
-
-            db.add(busy)
+        await _book_accepted_shifts(db, doctor_id, decision)
 
+    # Optionally queue the reply; the outbox sends it off the request path
+    if settings.WHATSAPP_AUTO_REPLY and decision.action != ActionType.NOT_AN_OFFER:
+        enqueue_message(db, payload.phone, decision.reply_text)
         await db.commit()
 
+    # Audit record – buffered, written in batches off the request path
+    total_ms = (time.perf_counter() - started) * 1000
+    await decision_log.submit(build_record(doctor_id, decision, trace, total_ms))
+
     return decision
@@ -1,14 +1,26 @@
 """Controllers for schedule management endpoints."""
 
+import base64
 from datetime import datetime, time
 
-from fastapi import APIRouter, Depends, HTTPException
-from pydantic import BaseModel, Field
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, Field, field_validator
+from sqlalchemy import Select, and_, literal, or_, select, union_all
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.models import AvailabilityRule, BusySlot, Doctor, RecurringBusyRule
-from app.db.session import get_db
+from app.ai.tools.occupancy import invalidate_weekly_occupancy
+from app.common.phone import normalize_phone
+from app.db.doctors import bump_schedule_version, doctor_exists
+from app.db.models import (
+    AvailabilityRule,
+    BusySlot,
+    BusySlotArchive,
+    Doctor,
+    RecurringBusyRule,
+)
+from app.db.retention import retention_cutoff
+from app.db.session import get_db, get_read_db
 
 router = APIRouter(prefix="/schedule")
 
@@ -20,6 +32,11 @@ class DoctorIn(BaseModel):
     name: str
     phone: str
 
+    @field_validator("phone")
+    @classmethod
+    def _normalize_phone(cls, value: str) -> str:
+        return normalize_phone(value)
+
 
 class AvailabilityIn(BaseModel):
     """Weekly availability window."""
@@ -58,12 +75,63 @@ def _parse_datetime(value: str) -> datetime:
     return datetime.fromisoformat(value)
 
 
-async def _get_doctor(db: AsyncSession, doctor_id: int) -> Doctor:
-    result = await db.execute(select(Doctor).where(Doctor.id == doctor_id))
-    doctor = result.scalars().first()
-    if not doctor:
+async def _ensure_doctor(db: AsyncSession, doctor_id: int) -> None:
+    if not await doctor_exists(db, doctor_id):
+        raise HTTPException(status_code=404, detail="Doctor not found")
+
+
+def _encode_cursor(*parts: object) -> str:
+    raw = "|".join(str(p) for p in parts)
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str, *parsers) -> tuple:
+    """Decode a cursor made by ``_encode_cursor``, parsing each part."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        parts = base64.urlsafe_b64decode(padded.encode()).decode().split("|")
+        if len(parts) != len(parsers):
+            raise ValueError(cursor)
+        return tuple(parse(part) for parse, part in zip(parsers, parts))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+async def _schedule_etag(db: AsyncSession, doctor_id: int) -> str:
+    """ETag of a doctor's whole schedule, derived from schedule_version."""
+    version = (
+        await db.execute(select(Doctor.schedule_version).where(Doctor.id == doctor_id))
+    ).scalar()
+    if version is None:
         raise HTTPException(status_code=404, detail="Doctor not found")
-    return doctor
+    return f'W/"{doctor_id}.{version}"'
+
+
+def _not_modified(request: Request, etag: str) -> Response | None:
+    """304 response when the client's If-None-Match already has *etag*."""
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in (tag.strip() for tag in if_none_match.split(",")) or if_none_match == "*":
+        return Response(status_code=304, headers={"ETag": etag})
+    return None
+
+
+async def _page(
+    db: AsyncSession,
+    stmt: Select,
+    limit: int,
+    to_item,
+    to_cursor,
+    etag: str,
+) -> JSONResponse:
+    """Run a keyset-paginated statement and build the JSON page."""
+    rows = (await db.execute(stmt.limit(limit + 1))).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    body = {
+        "items": [to_item(row) for row in rows],
+        "next_cursor": to_cursor(rows[-1]) if has_more else None,
+    }
+    return JSONResponse(body, headers={"ETag": etag})
 
 
 # ── Endpoints ────────────────────────────────────────────────────────────────
@@ -73,6 +141,9 @@ async def create_doctor(payload: DoctorIn, db: AsyncSession = Depends(get_db)):
     """Register a doctor (for testing convenience)."""
     doctor = Doctor(name=payload.name, phone=payload.phone)
     db.add(doctor)
+    await db.flush()
+    # Lets other workers drop a cached "unknown phone" for this number
+    await bump_schedule_version(db, doctor.id)
     await db.commit()
     await db.refresh(doctor)
     return {"id": doctor.id, "name": doctor.name, "phone": doctor.phone}
@@ -84,7 +155,7 @@ async def create_availability(
     db: AsyncSession = Depends(get_db),
 ):
     """Register weekly availability for a doctor."""
-    await _get_doctor(db, payload.doctor_id)
+    await _ensure_doctor(db, payload.doctor_id)
 
     rule = AvailabilityRule(
         doctor_id=payload.doctor_id,
@@ -93,8 +164,10 @@ async def create_availability(
         end_time=_parse_time(payload.end_time),
     )
     db.add(rule)
+    await bump_schedule_version(db, payload.doctor_id)
     await db.commit()
     await db.refresh(rule)
+    invalidate_weekly_occupancy(payload.doctor_id)
     return {"id": rule.id, "status": "created"}
 
 
@@ -104,7 +177,7 @@ async def create_busy_slot(
     db: AsyncSession = Depends(get_db),
 ):
     """Register a one-off busy slot."""
-    await _get_doctor(db, payload.doctor_id)
+    await _ensure_doctor(db, payload.doctor_id)
 
     slot = BusySlot(
         doctor_id=payload.doctor_id,
@@ -113,6 +186,7 @@ async def create_busy_slot(
         reason=payload.reason,
     )
     db.add(slot)
+    await bump_schedule_version(db, payload.doctor_id)
     await db.commit()
     await db.refresh(slot)
     return {"id": slot.id, "status": "created"}
@@ -124,7 +198,7 @@ async def create_recurring_busy(
     db: AsyncSession = Depends(get_db),
 ):
     """Register a recurring weekly busy block (e.g. lunch)."""
-    await _get_doctor(db, payload.doctor_id)
+    await _ensure_doctor(db, payload.doctor_id)
 
     rule = RecurringBusyRule(
         doctor_id=payload.doctor_id,
@@ -134,6 +208,160 @@ async def create_recurring_busy(
         label=payload.label,
     )
     db.add(rule)
+    await bump_schedule_version(db, payload.doctor_id)
     await db.commit()
     await db.refresh(rule)
+    invalidate_weekly_occupancy(payload.doctor_id)
     return {"id": rule.id, "status": "created"}
+
+
+# ── Read endpoints ───────────────────────────────────────────────────────────
+# Keyset-paginated; every response carries the doctor's schedule ETag and
+# answers 304 to a matching If-None-Match.
+
+def _weekly_rule_item(row) -> dict:
+    item = {
+        "id": row.id,
+        "weekday": row.weekday,
+        "start_time": row.start_time.strftime("%H:%M"),
+        "end_time": row.end_time.strftime("%H:%M"),
+    }
+    if "label" in row._fields:
+        item["label"] = row.label
+    return item
+
+
+async def _list_weekly_rules(
+    request: Request,
+    db: AsyncSession,
+    model: type[AvailabilityRule] | type[RecurringBusyRule],
+    doctor_id: int,
+    cursor: str | None,
+    limit: int,
+) -> Response:
+    etag = await _schedule_etag(db, doctor_id)
+    if (cached := _not_modified(request, etag)) is not None:
+        return cached
+
+    columns = [model.id, model.weekday, model.start_time, model.end_time]
+    if model is RecurringBusyRule:
+        columns.append(RecurringBusyRule.label)
+    stmt = select(*columns).where(model.doctor_id == doctor_id).order_by(model.id)
+    if cursor:
+        (last_id,) = _decode_cursor(cursor, int)
+        stmt = stmt.where(model.id > last_id)
+
+    return await _page(
+        db, stmt, limit, _weekly_rule_item, lambda row: _encode_cursor(row.id), etag,
+    )
+
+
+@router.get("/doctor/{doctor_id}/availability")
+async def list_availability(
+    request: Request,
+    doctor_id: int,
+    cursor: str | None = None,
+    limit: int = Query(default=100, ge=1, le=500),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """List a doctor's weekly availability windows."""
+    return await _list_weekly_rules(request, db, AvailabilityRule, doctor_id, cursor, limit)
+
+
+@router.get("/doctor/{doctor_id}/recurring-busy")
+async def list_recurring_busy(
+    request: Request,
+    doctor_id: int,
+    cursor: str | None = None,
+    limit: int = Query(default=100, ge=1, le=500),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """List a doctor's recurring weekly busy blocks."""
+    return await _list_weekly_rules(request, db, RecurringBusyRule, doctor_id, cursor, limit)
+
+
+def _busy_overlap(
+    model: type[BusySlot] | type[BusySlotArchive], doctor_id: int, start: datetime, end: datetime,
+) -> tuple:
+    return (
+        model.doctor_id == doctor_id,
+        model.start_dt < end,
+        model.end_dt > start,
+    )
+
+
+@router.get("/doctor/{doctor_id}/busy")
+async def list_busy_slots(
+    request: Request,
+    doctor_id: int,
+    start: datetime = Query(..., description="Range start (ISO datetime)"),
+    end: datetime = Query(..., description="Range end (ISO datetime)"),
+    cursor: str | None = None,
+    limit: int = Query(default=100, ge=1, le=500),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """List busy slots overlapping ``[start, end)``, ordered by start.
+
+    Ranges starting before the retention horizon also read
+    ``busy_slots_archive``; those items carry ``"archived": true`` and the
+    id the slot had before it was archived.
+    """
+    etag = await _schedule_etag(db, doctor_id)
+    if (cached := _not_modified(request, etag)) is not None:
+        return cached
+
+    # ``key`` is unique per source table; ``archived`` tells the two apart
+    sources = [
+        select(
+            BusySlot.id.label("key"),
+            BusySlot.id.label("slot_id"),
+            BusySlot.start_dt,
+            BusySlot.end_dt,
+            BusySlot.reason,
+            literal(0).label("archived"),
+        ).where(*_busy_overlap(BusySlot, doctor_id, start, end))
+    ]
+    # Archived slots all ended before the horizon, so later ranges skip the table
+    if start < retention_cutoff():
+        sources.append(
+            select(
+                BusySlotArchive.id,
+                BusySlotArchive.source_id,
+                BusySlotArchive.start_dt,
+                BusySlotArchive.end_dt,
+                BusySlotArchive.reason,
+                literal(1),
+            ).where(*_busy_overlap(BusySlotArchive, doctor_id, start, end))
+        )
+    slots = union_all(*sources).subquery("slots")
+
+    stmt = select(slots).order_by(slots.c.start_dt, slots.c.archived, slots.c.key)
+    if cursor:
+        last_start, last_archived, last_key = _decode_cursor(cursor, _parse_datetime, int, int)
+        stmt = stmt.where(
+            or_(
+                slots.c.start_dt > last_start,
+                and_(
+                    slots.c.start_dt == last_start,
+                    or_(
+                        slots.c.archived > last_archived,
+                        and_(slots.c.archived == last_archived, slots.c.key > last_key),
+                    ),
+                ),
+            )
+        )
+
+    return await _page(
+        db,
+        stmt,
+        limit,
+        lambda row: {
+            "id": row.slot_id,
+            "start_dt": row.start_dt.isoformat(),
+            "end_dt": row.end_dt.isoformat(),
+            "reason": row.reason,
+            "archived": bool(row.archived),
+        },
+        lambda row: _encode_cursor(row.start_dt.isoformat(), row.archived, row.key),
+        etag,
+    )
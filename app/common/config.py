@@ -8,14 +8,88 @@ class Settings(BaseSettings):
 
     APP_ENV: str = "development"
     PORT: int = 8000
+    LOG_LEVEL: str = "INFO"  # for the app.* loggers
+
+    # Startup
+    DB_AUTO_MIGRATE: bool = True  # False → refuse to start on an old schema
+    STARTUP_WARMUP: bool = True  # pre-open DB/LLM connections before /health/ready
 
     # Database
     DATABASE_URL: str = ""
+    DATABASE_READ_URL: str = ""  # optional replica for read-only paths
+
+    # Connection pool (ignored for SQLite)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECYCLE: int = 1800  # seconds; -1 disables
+    DB_POOL_PRE_PING: bool = True
+
+    # Doctor lookup cache (phone → doctor id)
+    DEFAULT_PHONE_COUNTRY_CODE: str = "55"
+    DOCTOR_CACHE_SIZE: int = 10_000
+    DOCTOR_CACHE_TTL_SECONDS: float = 300.0
+    DOCTOR_CACHE_NEGATIVE_TTL_SECONDS: float = 60.0  # unknown numbers (spam)
+    OCCUPANCY_CACHE_SIZE: int = 10_000  # doctors' weekly masks
+    OCCUPANCY_CACHE_TTL_SECONDS: float = 3600.0
+
+    # Cross-worker cache invalidation: "poll" (any DB), "notify"
+    # (PostgreSQL LISTEN/NOTIFY, polling as a fallback) or "off" (one worker)
+    CACHE_INVALIDATION_BACKEND: str = "poll"
+    CACHE_INVALIDATION_POLL_SECONDS: float = 1.0  # upper bound on staleness
+    # Changes are re-read for this long, so a write that commits after a
+    # later-numbered one is still seen (must exceed the longest write txn)
+    CACHE_INVALIDATION_REPOLL_SECONDS: float = 30.0
+
+    # BusySlot retention (slots ending this many days ago are archived)
+    BUSY_SLOT_RETENTION_DAYS: int = 30
+    BUSY_SLOT_ARCHIVE_BATCH_SIZE: int = 500
+    BUSY_SLOT_ARCHIVE_INTERVAL_SECONDS: int = 3600  # 0 disables the background task
 
     # OpenAI
     OPENAI_API_KEY: str = ""
     OPENAI_MODEL: str = "gpt-4o-mini"
 
+    # Offer extraction cascade (fast tier → strong tier)
+    OFFER_CASCADE_ENABLED: bool = True
+    OFFER_FAST_MODEL: str = "gpt-4.1-nano"
+    OFFER_STRONG_MODEL: str = ""  # empty → OPENAI_MODEL
+    OFFER_CASCADE_MIN_CONFIDENCE: float = 0.8
+    OFFER_CASCADE_MAX_FAST_SHIFTS: int = 1
+    # Comma-separated: low_confidence, multi_shift, missing_shifts
+    # (unparseable fast-tier output always escalates)
+    OFFER_CASCADE_ESCALATE_ON: str = "low_confidence,multi_shift,missing_shifts"
+
+    # Decision log (buffered, written in batches)
+    DECISION_LOG_ENABLED: bool = True
+    DECISION_LOG_BATCH_SIZE: int = 100
+    DECISION_LOG_FLUSH_SECONDS: float = 2.0
+    DECISION_LOG_BUFFER_SIZE: int = 10_000
+    DECISION_LOG_ENQUEUE_TIMEOUT_SECONDS: float = 0.05  # then the record is dropped
+
+    # WhatsApp Cloud API sender
+    WHATSAPP_API_URL: str = "https://graph.facebook.com/v21.0"
+    WHATSAPP_PHONE_NUMBER_ID: str = ""
+    WHATSAPP_ACCESS_TOKEN: str = ""
+    WHATSAPP_TIMEOUT_SECONDS: float = 10.0
+    WHATSAPP_MAX_CONNECTIONS: int = 20
+    WHATSAPP_AUTO_REPLY: bool = False  # enqueue the suggested reply from /message
+    # Rate limits (token buckets: messages per second + burst)
+    WHATSAPP_GLOBAL_RATE: float = 20.0
+    WHATSAPP_GLOBAL_BURST: int = 40
+    WHATSAPP_PER_NUMBER_RATE: float = 1.0
+    WHATSAPP_PER_NUMBER_BURST: int = 3
+    # Outbox dispatcher
+    WHATSAPP_OUTBOX_POLL_SECONDS: float = 1.0  # 0 disables the background task
+    WHATSAPP_OUTBOX_BATCH_SIZE: int = 50
+    WHATSAPP_OUTBOX_LEASE_SECONDS: int = 60
+    # Only the worker holding this lease dispatches, so the rate limits
+    # below apply to the whole deployment rather than to each worker
+    WHATSAPP_DISPATCHER_LEASE_SECONDS: int = 15
+    WHATSAPP_MAX_ATTEMPTS: int = 8
+    WHATSAPP_RETRY_BASE_SECONDS: float = 2.0
+    WHATSAPP_RETRY_MAX_SECONDS: float = 900.0
+
     # OpenTelemetry / LangSmith
     OTEL_SERVICE_NAME: str = "plantao-ai"
     OTEL_EXPORTER_OTLP_ENDPOINT: str = "https://api.smith.langchain.com/otel"
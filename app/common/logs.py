@@ -0,0 +1,24 @@
+"""Logging for the ``app.*`` loggers.
+
+Uvicorn only configures its own loggers and leaves the root logger at
+WARNING, so without this the INFO lines the app relies on (startup
+timings, per-call prompt usage) would never be printed.
+"""
+
+import logging
+
+from app.common.config import settings
+
+LOG_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+
+
+def setup_logging() -> None:
+    """Give the ``app`` logger a stderr handler at ``LOG_LEVEL`` (idempotent)."""
+    logger = logging.getLogger("app")
+    logger.setLevel(settings.LOG_LEVEL.upper())
+    if not logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        logger.addHandler(handler)
+    # Records are handled here; don't print them twice via the root logger
+    logger.propagate = False
@@ -0,0 +1,32 @@
+"""Phone number normalisation to E.164."""
+
+import re
+
+from app.common.config import settings
+
+_NON_DIGITS = re.compile(r"\D")
+
+
+def normalize_phone(raw: str) -> str:
+    """Normalise a phone number to E.164 (``+<country><number>``).
+
+    Spaces, dashes, dots and parentheses are ignored, a leading ``00`` is
+    treated as ``+``, and national numbers (10–11 digits, e.g. ``11 99999-9999``)
+    get ``DEFAULT_PHONE_COUNTRY_CODE`` prepended.
+
+    Raises:
+        ValueError: If the result is not a plausible E.164 number.
+    """
+    value = raw.strip()
+    digits = _NON_DIGITS.sub("", value)
+
+    if value.startswith("+"):
+        pass
+    elif digits.startswith("00"):
+        digits = digits[2:]
+    elif len(digits) in (10, 11):
+        digits = settings.DEFAULT_PHONE_COUNTRY_CODE + digits
+
+    if not 8 <= len(digits) <= 15 or digits.startswith("0"):
+        raise ValueError(f"invalid phone number: {raw!r}")
+    return f"+{digits}"
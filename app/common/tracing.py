@@ -1,24 +1,35 @@
-"""OpenTelemetry setup – exports traces to LangSmith via OTLP/HTTP."""
+"""OpenTelemetry setup – exports traces to LangSmith via OTLP/HTTP.
+
+The SDK, exporter and instrumentors are imported inside the functions so
+that booting without tracing configured does not pay for them.
+"""
 
 import logging
 
-from opentelemetry import trace
-from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
-from opentelemetry.sdk.trace import TracerProvider
-from opentelemetry.sdk.trace.export import SimpleSpanProcessor
-from openinference.instrumentation.agno import AgnoInstrumentor
+from fastapi import FastAPI
 
 from app.common.config import settings
 
 logger = logging.getLogger(__name__)
 
 
+def tracing_enabled() -> bool:
+    """Tracing is only configured when a LangSmith API key is present."""
+    return bool(settings.LANGSMITH_API_KEY)
+
+
 def setup_tracing() -> None:
     """Initialise TracerProvider, OTLP exporter, and Agno instrumentor."""
-    if not settings.LANGSMITH_API_KEY:
+    if not tracing_enabled():
         logger.warning("LANGSMITH_API_KEY not set – tracing disabled.")
         return
 
+    from opentelemetry import trace
+    from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+    from openinference.instrumentation.agno import AgnoInstrumentor
+
     headers = {
         "x-api-key": settings.LANGSMITH_API_KEY,
         "Langsmith-Project": settings.LANGSMITH_PROJECT,
@@ -40,4 +51,14 @@ def setup_tracing() -> None:
     # Instrument Agno so agent/skill calls show up as spans
     AgnoInstrumentor().instrument()
 
-    logger.info("Tracing configured → LangSmith project '%s'", settings.LANGSMITH_PROJECT)
\ No newline at end of file
+    logger.info("Tracing configured → LangSmith project '%s'", settings.LANGSMITH_PROJECT)
+
+
+def instrument_app(app: FastAPI) -> None:
+    """Instrument FastAPI with OpenTelemetry (no-op when tracing is off)."""
+    if not tracing_enabled():
+        return
+
+    from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
+
+    FastAPIInstrumentor.instrument_app(app)
@@ -0,0 +1,161 @@
+"""Append-only decision log with batched, asynchronous writes.
+
+``process_message`` hands each decision to ``decision_log.submit``, which
+only puts it on an in-memory queue. A background task drains the queue and
+bulk-inserts batches, flushing when ``DECISION_LOG_BATCH_SIZE`` records are
+buffered or ``DECISION_LOG_FLUSH_SECONDS`` have passed. When the buffer is
+full, ``submit`` waits up to ``DECISION_LOG_ENQUEUE_TIMEOUT_SECONDS`` and
+then drops the record (counted in ``dropped``) rather than stall requests.
+``stop`` flushes whatever is left on shutdown.
+"""
+
+import asyncio
+import logging
+from datetime import datetime
+
+from sqlalchemy import insert
+
+from app.ai.run_trace import RunTrace
+from app.ai.schemas import DecisionOut
+from app.common.config import settings
+from app.db.models import DecisionLog
+from app.db.session import async_session
+
+logger = logging.getLogger(__name__)
+
+
+def build_record(
+    doctor_id: int,
+    decision: DecisionOut,
+    trace: RunTrace,
+    total_ms: float,
+) -> dict:
+    """Flatten a decision and its run trace into a DecisionLog row."""
+    extraction = trace.extraction
+    return {
+        "created_at": datetime.now(),
+        "doctor_id": doctor_id,
+        "action": decision.action.value,
+        "is_offer": bool(extraction and extraction.is_offer),
+        "shift_count": len(extraction.shifts) if extraction else 0,
+        "extraction_model": trace.models.get("offer_extraction"),
+        "decision_model": trace.models.get("decision"),
+        "escalation_reason": trace.escalation,
+        "fallback": bool(trace.fallbacks),
+        "extraction_ms": trace.stages_ms.get("extraction"),
+        "schedule_ms": trace.stages_ms.get("schedule_check"),
+        "decision_ms": trace.stages_ms.get("decision"),
+        "total_ms": total_ms,
+        "payload": {
+            "decision": decision.model_dump(mode="json"),
+            "extraction": extraction.model_dump(mode="json") if extraction else None,
+            "fallbacks": sorted(trace.fallbacks),
+        },
+    }
+
+
+class DecisionLogWriter:
+    """Buffers DecisionLog rows and writes them in batches."""
+
+    def __init__(
+        self,
+        batch_size: int,
+        flush_seconds: float,
+        buffer_size: int,
+        enqueue_timeout: float,
+    ) -> None:
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.buffer_size = buffer_size
+        self.enqueue_timeout = enqueue_timeout
+        self.written = 0
+        self.dropped = 0
+        self._queue: asyncio.Queue[dict] | None = None
+        self._task: asyncio.Task | None = None
+        self._inflight: asyncio.Future | None = None
+        self._pending: list[dict] = []  # batch being collected
+
+    def start(self) -> None:
+        """Start the background flusher (must run inside the event loop)."""
+        self._queue = asyncio.Queue(maxsize=self.buffer_size)
+        self._task = asyncio.create_task(self._run(), name="decision-log")
+
+    async def submit(self, record: dict) -> None:
+        """Queue a record; applies backpressure, then drops, when full."""
+        if self._queue is None:
+            return
+        try:
+            self._queue.put_nowait(record)
+            return
+        except asyncio.QueueFull:
+            pass
+        try:
+            await asyncio.wait_for(self._queue.put(record), self.enqueue_timeout)
+        except TimeoutError:
+            self.dropped += 1
+            logger.warning("Decision log buffer full – record dropped")
+
+    async def _next_batch(self) -> list[dict]:
+        assert self._queue is not None
+        batch = self._pending
+        batch.append(await self._queue.get())
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.flush_seconds
+        while len(batch) < self.batch_size:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except TimeoutError:
+                break
+        return batch
+
+    async def _write(self, batch: list[dict]) -> None:
+        try:
+            async with async_session() as db:
+                await db.execute(insert(DecisionLog), batch)
+                await db.commit()
+            self.written += len(batch)
+        except Exception:
+            self.dropped += len(batch)
+            logger.exception("Failed to write %d decision log records", len(batch))
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._next_batch()
+            self._pending = []
+            # Shielded so shutdown never cancels a batch halfway through
+            self._inflight = asyncio.ensure_future(self._write(batch))
+            await asyncio.shield(self._inflight)
+
+    async def stop(self) -> None:
+        """Stop the flusher and write everything still buffered."""
+        if self._task is None or self._queue is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        if self._inflight is not None and not self._inflight.done():
+            await self._inflight
+        if self._pending:
+            await self._write(self._pending)
+            self._pending = []
+
+        while not self._queue.empty():
+            batch = []
+            while not self._queue.empty() and len(batch) < self.batch_size:
+                batch.append(self._queue.get_nowait())
+            await self._write(batch)
+        self._queue = None
+        self._task = None
+
+
+decision_log = DecisionLogWriter(
+    batch_size=settings.DECISION_LOG_BATCH_SIZE,
+    flush_seconds=settings.DECISION_LOG_FLUSH_SECONDS,
+    buffer_size=settings.DECISION_LOG_BUFFER_SIZE,
+    enqueue_timeout=settings.DECISION_LOG_ENQUEUE_TIMEOUT_SECONDS,
+)
@@ -0,0 +1,139 @@
+"""Cached doctor lookups.
+
+Every ``/message`` starts by resolving the sender's phone to a doctor and
+every schedule write checks that the doctor exists. Doctors almost never
+change, so both answers are kept in bounded in-process caches; unknown
+phones are cached too (for a shorter time) so spam doesn't reach the DB.
+
+ORM events on ``Doctor`` drop cached entries touched by writes made through
+this process (never priming them: the write may still roll back);
+``app.db.invalidation`` does the same for writes made by other workers,
+driven by ``bump_schedule_version``.
+"""
+
+from collections.abc import Iterable
+
+from sqlalchemy import event, func, inspect, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.common.cache import MISSING, LRUCache
+from app.common.config import settings
+from app.common.phone import normalize_phone
+from app.db.models import DOCTOR_CHANGE_SEQ, CacheVersion, Doctor
+
+# Name of the CacheVersion row counting doctor/schedule changes (SQLite)
+DOCTORS_SCOPE = "doctors"
+# PostgreSQL NOTIFY channel used by the "notify" invalidation backend
+INVALIDATION_CHANNEL = "cache_invalidation"
+
+# E.164 phone → doctor id (None = known not to be a doctor)
+_by_phone: LRUCache[str, int | None] = LRUCache(
+    settings.DOCTOR_CACHE_SIZE, settings.DOCTOR_CACHE_TTL_SECONDS,
+)
+# doctor id → True for doctors known to exist
+_known_ids: LRUCache[int, bool] = LRUCache(
+    settings.DOCTOR_CACHE_SIZE, settings.DOCTOR_CACHE_TTL_SECONDS,
+)
+
+
+async def get_doctor_id_by_phone(db: AsyncSession, phone: str) -> int | None:
+    """Resolve a phone number (any formatting) to a doctor id."""
+    try:
+        phone = normalize_phone(phone)
+    except ValueError:
+        return None
+
+    cached = _by_phone.get(phone)
+    if cached is not MISSING:
+        return cached
+
+    doctor_id = (
+        await db.execute(select(Doctor.id).where(Doctor.phone == phone))
+    ).scalar()
+    if doctor_id is None:
+        _by_phone.set(phone, None, ttl=settings.DOCTOR_CACHE_NEGATIVE_TTL_SECONDS)
+    else:
+        _by_phone.set(phone, doctor_id)
+        _known_ids.set(doctor_id, True)
+    return doctor_id
+
+
+async def doctor_exists(db: AsyncSession, doctor_id: int) -> bool:
+    """True if a doctor with *doctor_id* exists (positive answers cached)."""
+    if _known_ids.get(doctor_id) is not MISSING:
+        return True
+    found = (
+        await db.execute(select(Doctor.id).where(Doctor.id == doctor_id))
+    ).scalar() is not None
+    if found:
+        _known_ids.set(doctor_id, True)
+    return found
+
+
+async def _next_change_seq(db: AsyncSession) -> int:
+    if db.bind.dialect.name == "postgresql":
+        return (await db.execute(select(DOCTOR_CHANGE_SEQ.next_value()))).scalar_one()
+    return (
+        await db.execute(
+            update(CacheVersion)
+            .where(CacheVersion.name == DOCTORS_SCOPE)
+            .values(version=CacheVersion.version + 1)
+            .returning(CacheVersion.version)
+        )
+    ).scalar_one()
+
+
+async def bump_schedule_version(db: AsyncSession, doctor_ids: int | Iterable[int]) -> None:
+    """Mark doctors' schedules as changed (commits with the caller's write).
+
+    The doctors are also stamped with a new change number, which other
+    workers poll for. On PostgreSQL numbers come from a sequence, so
+    writers don't wait on each other but may commit out of order; the
+    poller re-reads a short window (``CACHE_INVALIDATION_REPOLL_SECONDS``)
+    to pick up late commits.
+    """
+    ids = [doctor_ids] if isinstance(doctor_ids, int) else list(set(doctor_ids))
+    if not ids:
+        return
+    seq = await _next_change_seq(db)
+    await db.execute(
+        update(Doctor)
+        .where(Doctor.id.in_(ids))
+        .values(schedule_version=Doctor.schedule_version + 1, changed_seq=seq)
+        .execution_options(synchronize_session=False)
+    )
+    if (
+        settings.CACHE_INVALIDATION_BACKEND == "notify"
+        and db.bind.dialect.name == "postgresql"
+    ):
+        # Delivered on commit; listeners then poll straight away
+        await db.execute(select(func.pg_notify(INVALIDATION_CHANNEL, str(seq))))
+
+
+def invalidate_doctor(doctor_id: int | None = None, phone: str | None = None) -> None:
+    """Drop cached entries for a doctor id and/or phone."""
+    if doctor_id is not None:
+        _known_ids.pop(doctor_id)
+    if phone is not None:
+        _by_phone.pop(phone)
+
+
+@event.listens_for(Doctor, "after_insert")
+def _on_doctor_insert(_mapper, _connection, target: Doctor) -> None:
+    # Runs at flush, before commit: only clear a negative entry for the new
+    # phone. Priming here would outlive a rollback (and SQLite may give the
+    # id to another doctor); the first lookup caches the committed row.
+    invalidate_doctor(doctor_id=target.id, phone=target.phone)
+
+
+@event.listens_for(Doctor, "after_update")
+def _on_doctor_update(_mapper, _connection, target: Doctor) -> None:
+    history = inspect(target).attrs.phone.history
+    for phone in (*history.deleted, *history.added):
+        invalidate_doctor(phone=phone)
+    invalidate_doctor(doctor_id=target.id, phone=target.phone)
+
+
+@event.listens_for(Doctor, "after_delete")
+def _on_doctor_delete(_mapper, _connection, target: Doctor) -> None:
+    invalidate_doctor(doctor_id=target.id, phone=target.phone)
@@ -0,0 +1,184 @@
+"""Cross-worker cache invalidation.
+
+Each worker keeps in-process caches (doctor lookups, weekly occupancy
+masks). Every schedule or doctor write goes through
+``bump_schedule_version``, which stamps the doctor row with a new change
+number (``doctors.changed_seq``). This bus polls for changed rows and
+drops their cached entries, so a write on one worker reaches every other
+worker within ``CACHE_INVALIDATION_POLL_SECONDS``.
+
+Change numbers are handed out without a lock, so a transaction holding
+number 10 may commit after one holding 11. Each poll therefore re-reads
+everything above the *floor* – the highest number seen at least
+``CACHE_INVALIDATION_REPOLL_SECONDS`` ago – and only acts on (doctor,
+number) pairs it has not handled yet.
+
+With ``CACHE_INVALIDATION_BACKEND=notify`` on PostgreSQL, writers also
+``NOTIFY`` on commit and a dedicated asyncpg connection ``LISTEN``s, so the
+poll runs right away; the periodic poll stays on as a fallback for lost
+connections. Polls go to the read database the caches are filled from.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+
+from sqlalchemy import select
+from sqlalchemy.engine import make_url
+
+from app.ai.tools.occupancy import invalidate_weekly_occupancy
+from app.common.config import settings
+from app.db.doctors import INVALIDATION_CHANNEL, invalidate_doctor
+from app.db.models import Doctor
+from app.db.session import read_session
+
+logger = logging.getLogger(__name__)
+
+
+class InvalidationBus:
+    """Polls the shared change counter and invalidates local caches."""
+
+    def __init__(self, backend: str, poll_seconds: float, repoll_seconds: float) -> None:
+        self.backend = backend
+        self.poll_seconds = poll_seconds
+        self.repoll_seconds = repoll_seconds
+        self.watermark = 0
+        self.floor = 0
+        self.polls = 0
+        self.invalidated = 0
+        self.listening = False
+        self._last_poll: float | None = None
+        # (poll time, watermark then) – the floor catches up as these age
+        self._marks: deque[tuple[float, int]] = deque()
+        # doctor id → change number already handled, for numbers above the floor
+        self._handled: dict[int, int] = {}
+        self._wake = asyncio.Event()
+        self._tasks: list[asyncio.Task] = []
+
+    async def start(self) -> None:
+        """Start polling (and listening); must run inside the event loop."""
+        if self.backend == "off" or self.poll_seconds <= 0:
+            return
+        # Caches start empty, so every change committed so far is handled.
+        # The floor stays at 0 for one window: writes in flight right now
+        # may still commit with a lower number than the watermark.
+        async with read_session() as db:
+            rows = (
+                await db.execute(
+                    select(Doctor.id, Doctor.changed_seq).where(Doctor.changed_seq > 0)
+                )
+            ).all()
+        self._handled = {row.id: row.changed_seq for row in rows}
+        self.watermark = max(self._handled.values(), default=0)
+        self._marks.append((time.monotonic(), self.watermark))
+        self._tasks.append(asyncio.create_task(self._poll_loop(), name="cache-invalidation"))
+        if self.backend == "notify":
+            if make_url(settings.DATABASE_URL).get_backend_name() == "postgresql":
+                self._tasks.append(
+                    asyncio.create_task(self._listen_loop(), name="cache-invalidation-listen")
+                )
+            else:
+                logger.warning("CACHE_INVALIDATION_BACKEND=notify needs PostgreSQL; polling only")
+
+    async def poll_once(self) -> int:
+        """Invalidate everything changed since the last poll; return the count."""
+        now = time.monotonic()
+        while self._marks and self._marks[0][0] <= now - self.repoll_seconds:
+            self.floor = self._marks.popleft()[1]
+
+        async with read_session() as db:
+            rows = (
+                await db.execute(
+                    select(Doctor.id, Doctor.phone, Doctor.changed_seq)
+                    .where(Doctor.changed_seq > self.floor)
+                    .order_by(Doctor.changed_seq)
+                )
+            ).all()
+        fresh = [row for row in rows if self._handled.get(row.id) != row.changed_seq]
+        for row in fresh:
+            invalidate_weekly_occupancy(row.id)
+            invalidate_doctor(doctor_id=row.id, phone=row.phone)
+            self._handled[row.id] = row.changed_seq
+        if fresh:
+            self.invalidated += len(fresh)
+            logger.debug("Invalidated cached state for %d doctors", len(fresh))
+        if rows:
+            self.watermark = max(self.watermark, rows[-1].changed_seq)
+        self._handled = {
+            doctor_id: seq for doctor_id, seq in self._handled.items() if seq > self.floor
+        }
+        self._marks.append((now, self.watermark))
+        self.polls += 1
+        self._last_poll = now
+        return len(fresh)
+
+    async def _poll_loop(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.poll_seconds)
+            except TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await self.poll_once()
+            except Exception:
+                logger.exception("Cache invalidation poll failed")
+
+    async def _listen_loop(self) -> None:
+        import asyncpg
+
+        dsn = make_url(settings.DATABASE_URL).set(drivername="postgresql")
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(dsn.render_as_string(hide_password=False))
+                closed = asyncio.get_running_loop().create_future()
+                connection.add_termination_listener(
+                    lambda _conn: closed.done() or closed.set_result(None)
+                )
+                await connection.add_listener(
+                    INVALIDATION_CHANNEL, lambda *_args: self._wake.set(),
+                )
+                self.listening = True
+                self._wake.set()  # catch up on anything sent while disconnected
+                await closed
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.warning("Cache invalidation listener failed; retrying", exc_info=True)
+            finally:
+                self.listening = False
+                if connection is not None and not connection.is_closed():
+                    await connection.close()
+            await asyncio.sleep(self.poll_seconds)
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+
+    def snapshot(self) -> dict:
+        return {
+            "backend": self.backend,
+            "listening": self.listening,
+            "watermark": self.watermark,
+            "floor": self.floor,
+            "polls": self.polls,
+            "invalidated": self.invalidated,
+            "last_poll_age_s": (
+                round(time.monotonic() - self._last_poll, 3) if self._last_poll else None
+            ),
+        }
+
+
+invalidation_bus = InvalidationBus(
+    backend=settings.CACHE_INVALIDATION_BACKEND,
+    poll_seconds=settings.CACHE_INVALIDATION_POLL_SECONDS,
+    repoll_seconds=settings.CACHE_INVALIDATION_REPOLL_SECONDS,
+)
@@ -0,0 +1,323 @@
+"""Lightweight, ordered schema migrations.
+
+The applied version lives in a one-row ``schema_version`` table. On startup
+``migrate`` compares it with the latest entry in ``MIGRATIONS`` and only
+runs what is missing, so an up-to-date database costs two cheap queries.
+
+Every migration must be idempotent: databases created before versioning
+existed (by the old ``create_all`` on boot) start at version 0 and replay
+everything.
+
+Run manually with ``python -m app.db.migrations``.
+"""
+
+import asyncio
+import logging
+from collections.abc import Callable
+
+from sqlalchemy import (
+    Column,
+    Connection,
+    Integer,
+    MetaData,
+    Table,
+    delete,
+    func,
+    inspect,
+    select,
+    text,
+    update,
+)
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.schema import AddConstraint, CreateTable
+
+from app.common.phone import normalize_phone
+from app.db.doctors import DOCTORS_SCOPE
+from app.db.models import (
+    DOCTOR_CHANGE_SEQ,
+    AvailabilityRule,
+    Base,
+    BusySlot,
+    BusySlotArchive,
+    CacheVersion,
+    DecisionLog,
+    Doctor,
+    Lease,
+    OutboundMessage,
+    RecurringBusyRule,
+)
+
+logger = logging.getLogger(__name__)
+
+_version_metadata = MetaData()
+schema_version_table = Table(
+    "schema_version",
+    _version_metadata,
+    Column("version", Integer, nullable=False),
+)
+
+
+# ── Migrations ───────────────────────────────────────────────────────────────
+
+def _create_tables(conn: Connection) -> None:
+    """v1 – create any missing table (the old boot-time create_all)."""
+    Base.metadata.create_all(conn)
+
+
+def _rebuild_sqlite_table(conn: Connection, table: Table) -> None:
+    """Recreate a SQLite table from its model, keeping the rows.
+
+    SQLite cannot add foreign keys with ALTER TABLE, so this follows its
+    documented rebuild: create the new table under a scratch name, copy the
+    common columns, drop the old table, rename the new one into place and
+    recreate the indexes. ``migrate`` runs it with foreign keys off inside
+    one explicit transaction and checks them before committing.
+    """
+    old_columns = {c["name"] for c in inspect(conn).get_columns(table.name)}
+    columns = ", ".join(c.name for c in table.columns if c.name in old_columns)
+
+    scratch = MetaData()
+    for fk in table.foreign_keys:
+        fk.column.table.to_metadata(scratch)
+    new_table = table.to_metadata(scratch, name=f"_{table.name}_new")
+
+    conn.execute(CreateTable(new_table))
+    conn.exec_driver_sql(
+        f'INSERT INTO "{new_table.name}" ({columns}) SELECT {columns} FROM "{table.name}"'
+    )
+    conn.exec_driver_sql(f'DROP TABLE "{table.name}"')
+    conn.exec_driver_sql(f'ALTER TABLE "{new_table.name}" RENAME TO "{table.name}"')
+    for index in table.indexes:
+        index.create(conn)
+
+
+def _delete_orphans(conn: Connection, table: Table) -> None:
+    """Delete rows whose doctor no longer exists, so the foreign key fits."""
+    doctors = Doctor.__table__
+    result = conn.execute(
+        delete(table).where(table.c.doctor_id.not_in(select(doctors.c.id)))
+    )
+    if result.rowcount:
+        logger.warning(
+            "Deleted %d %s rows pointing at missing doctors", result.rowcount, table.name,
+        )
+
+
+def _add_schedule_keys(conn: Connection) -> None:
+    """v2 – doctor foreign keys and lookup indexes on the schedule tables."""
+    inspector = inspect(conn)
+
+    for model in (AvailabilityRule, BusySlot, RecurringBusyRule):
+        table = model.__table__
+        has_fk = bool(inspector.get_foreign_keys(table.name))
+        if not has_fk:
+            _delete_orphans(conn, table)
+
+        if conn.dialect.name == "sqlite":
+            if not has_fk:
+                _rebuild_sqlite_table(conn, table)
+            continue
+
+        if not has_fk:
+            for fk in table.foreign_key_constraints:
+                conn.execute(AddConstraint(fk))
+        for index in table.indexes:
+            index.create(conn, checkfirst=True)
+
+
+def _create_busy_slot_archive(conn: Connection) -> None:
+    """v3 – archive table for expired BusySlots and the end_dt index that finds them."""
+    Base.metadata.create_all(conn, tables=[BusySlotArchive.__table__])
+    for index in BusySlot.__table__.indexes:
+        index.create(conn, checkfirst=True)
+
+
+def _create_outbox(conn: Connection) -> None:
+    """v4 – WhatsApp outbox and the dispatcher lease."""
+    Base.metadata.create_all(conn, tables=[OutboundMessage.__table__, Lease.__table__])
+
+
+def _normalize_doctor_phones(conn: Connection) -> None:
+    """v5 – store doctor phones in E.164 so cache keys match."""
+    doctors = Doctor.__table__
+    rows = conn.execute(select(doctors.c.id, doctors.c.phone)).all()
+    taken = {phone for _, phone in rows}
+
+    for doctor_id, phone in rows:
+        try:
+            normalized = normalize_phone(phone)
+        except ValueError:
+            logger.warning("Doctor %d has an invalid phone %r; left as is", doctor_id, phone)
+            continue
+        if normalized == phone:
+            continue
+        if normalized in taken:
+            logger.warning(
+                "Doctor %d phone %r normalises to %s, already in use; left as is",
+                doctor_id, phone, normalized,
+            )
+            continue
+        conn.execute(update(doctors).where(doctors.c.id == doctor_id).values(phone=normalized))
+        taken.add(normalized)
+
+
+def _add_schedule_version(conn: Connection) -> None:
+    """v6 – per-doctor schedule version (ETag source)."""
+    columns = {c["name"] for c in inspect(conn).get_columns(Doctor.__tablename__)}
+    if "schedule_version" not in columns:
+        conn.exec_driver_sql(
+            "ALTER TABLE doctors ADD COLUMN schedule_version INTEGER NOT NULL DEFAULT 0"
+        )
+
+
+def _create_decision_log(conn: Connection) -> None:
+    """v7 – append-only decision log."""
+    Base.metadata.create_all(conn, tables=[DecisionLog.__table__])
+
+
+def _add_change_counter(conn: Connection) -> None:
+    """v8 – shared change counter for cross-worker cache invalidation."""
+    columns = {c["name"] for c in inspect(conn).get_columns(Doctor.__tablename__)}
+    if "changed_seq" not in columns:
+        conn.exec_driver_sql(
+            "ALTER TABLE doctors ADD COLUMN changed_seq INTEGER NOT NULL DEFAULT 0"
+        )
+    for index in Doctor.__table__.indexes:
+        index.create(conn, checkfirst=True)
+
+    Base.metadata.create_all(conn, tables=[CacheVersion.__table__])
+    counter = CacheVersion.__table__
+    exists = conn.execute(
+        select(counter.c.name).where(counter.c.name == DOCTORS_SCOPE)
+    ).scalar()
+    if exists is None:
+        conn.execute(counter.insert().values(name=DOCTORS_SCOPE, version=0))
+
+
+def _create_change_sequence(conn: Connection) -> None:
+    """v10 – sequence for doctors.changed_seq on PostgreSQL (no hot counter row)."""
+    if conn.dialect.name != "postgresql":
+        return
+    DOCTOR_CHANGE_SEQ.create(conn, checkfirst=True)
+    # Continue above every number handed out so far, or pollers would skip changes
+    counter = CacheVersion.__table__
+    last = max(
+        conn.execute(select(func.max(Doctor.__table__.c.changed_seq))).scalar() or 0,
+        conn.execute(
+            select(counter.c.version).where(counter.c.name == DOCTORS_SCOPE)
+        ).scalar() or 0,
+    )
+    if last:
+        conn.execute(text(f"SELECT setval('{DOCTOR_CHANGE_SEQ.name}', :last)"), {"last": last})
+
+
+MIGRATIONS: list[tuple[int, str, Callable[[Connection], None]]] = [
+    (1, "create tables", _create_tables),
+    (2, "schedule foreign keys and indexes", _add_schedule_keys),
+    (3, "busy slot archive", _create_busy_slot_archive),
+    (4, "whatsapp outbox", _create_outbox),
+    (5, "normalise doctor phones", _normalize_doctor_phones),
+    (6, "doctor schedule version", _add_schedule_version),
+    (7, "decision log", _create_decision_log),
+    (8, "cache invalidation counter", _add_change_counter),
+    # 9 (busy slot archive surrogate key) is now part of v3
+    (10, "doctor change sequence", _create_change_sequence),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+# ── Runner ───────────────────────────────────────────────────────────────────
+
+def _current_version(conn: Connection) -> int:
+    _version_metadata.create_all(conn)
+    version = conn.execute(select(schema_version_table.c.version)).scalar()
+    return version or 0
+
+
+# Arbitrary key for pg_advisory_xact_lock
+_MIGRATION_LOCK_KEY = 7_412_803
+
+
+def _apply(conn: Connection) -> int:
+    if conn.dialect.name == "postgresql":
+        # Several workers may boot at once; only one migrates at a time
+        conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": _MIGRATION_LOCK_KEY})
+    version = _current_version(conn)
+    if version >= LATEST_VERSION:
+        return version
+
+    for number, description, upgrade in MIGRATIONS:
+        if number <= version:
+            continue
+        logger.info("Applying migration %d: %s", number, description)
+        upgrade(conn)
+
+    conn.execute(schema_version_table.delete())
+    conn.execute(schema_version_table.insert().values(version=LATEST_VERSION))
+    return LATEST_VERSION
+
+
+def _read_version(conn: Connection) -> int:
+    if not inspect(conn).has_table(schema_version_table.name):
+        return 0
+    return conn.execute(select(schema_version_table.c.version)).scalar() or 0
+
+
+async def schema_version(engine: AsyncEngine) -> int:
+    """Return the applied schema version without changing anything."""
+    async with engine.connect() as conn:
+        return await conn.run_sync(_read_version)
+
+
+def _check_foreign_keys(conn: Connection) -> None:
+    violations = conn.exec_driver_sql("PRAGMA foreign_key_check").all()
+    if violations:
+        raise RuntimeError(f"Migration left foreign key violations: {violations[:5]}")
+
+
+async def _migrate_sqlite(engine: AsyncEngine) -> int:
+    """Migrate SQLite in one explicit transaction with foreign keys off.
+
+    The driver only opens transactions before DML, so DDL would otherwise
+    commit statement by statement, and ``PRAGMA foreign_keys`` cannot
+    change inside a transaction. Both matter for table rebuilds.
+    """
+    async with engine.connect() as conn:
+        await conn.execution_options(isolation_level="AUTOCOMMIT")
+        foreign_keys = (await conn.exec_driver_sql("PRAGMA foreign_keys")).scalar()
+        await conn.exec_driver_sql("PRAGMA foreign_keys=OFF")
+        try:
+            await conn.exec_driver_sql("BEGIN IMMEDIATE")
+            try:
+                version = await conn.run_sync(_apply)
+                await conn.run_sync(_check_foreign_keys)
+            except BaseException:
+                await conn.exec_driver_sql("ROLLBACK")
+                raise
+            await conn.exec_driver_sql("COMMIT")
+        finally:
+            await conn.exec_driver_sql(f"PRAGMA foreign_keys={int(foreign_keys)}")
+        return version
+
+
+async def migrate(engine: AsyncEngine) -> int:
+    """Bring the database schema up to date and return its version."""
+    if engine.dialect.name == "sqlite":
+        return await _migrate_sqlite(engine)
+    async with engine.begin() as conn:
+        return await conn.run_sync(_apply)
+
+
+async def _main() -> None:
+    from app.db.session import engine
+
+    try:
+        print(f"schema version: {await migrate(engine)}")
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_main())
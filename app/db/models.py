@@ -2,13 +2,35 @@
 
 from datetime import date, datetime, time
 
-from sqlalchemy import Date, DateTime, Integer, String, Time, UniqueConstraint
+from sqlalchemy import (
+    JSON,
+    Boolean,
+    Date,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    MetaData,
+    Sequence,
+    String,
+    Time,
+    UniqueConstraint,
+)
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 
+# Deterministic constraint names so migrations can find them again
+NAMING_CONVENTION = {
+    "ix": "ix_%(table_name)s_%(column_0_N_name)s",
+    "uq": "uq_%(table_name)s_%(column_0_N_name)s",
+    "fk": "fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s",
+    "pk": "pk_%(table_name)s",
+}
+
 
 class Base(DeclarativeBase):
     """Shared base for all models."""
-    pass
+    metadata = MetaData(naming_convention=NAMING_CONVENTION)
 
 
 class Doctor(Base):
@@ -19,6 +41,34 @@ class Doctor(Base):
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     name: Mapped[str] = mapped_column(String(120), nullable=False)
     phone: Mapped[str] = mapped_column(String(20), unique=True, nullable=False)
+    # Bumped on every schedule change; exposed as the schedule ETag
+    schedule_version: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default="0",
+    )
+    # Change number handed out at the last change; other workers poll for
+    # rows above their watermark
+    changed_seq: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default="0",
+    )
+
+    __table_args__ = (
+        Index("ix_doctors_changed_seq", "changed_seq"),
+    )
+
+
+# Source of doctors.changed_seq on PostgreSQL. nextval takes no row lock, so
+# concurrent writers never queue on it; SQLite serialises writers anyway and
+# counts in the "doctors" CacheVersion row instead.
+DOCTOR_CHANGE_SEQ = Sequence("doctor_change_seq", metadata=Base.metadata)
+
+
+class CacheVersion(Base):
+    """Named change counter shared by all workers (SQLite cache invalidation)."""
+
+    __tablename__ = "cache_versions"
+
+    name: Mapped[str] = mapped_column(String(32), primary_key=True)
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
 
 
 class AvailabilityRule(Base):
@@ -27,11 +77,14 @@ class AvailabilityRule(Base):
     __tablename__ = "availability_rules"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    doctor_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    doctor_id: Mapped[int] = mapped_column(
+        ForeignKey("doctors.id", ondelete="CASCADE"), nullable=False,
+    )
     weekday: Mapped[int] = mapped_column(Integer, nullable=False)  # 0=Mon … 6=Sun
     start_time: Mapped[time] = mapped_column(Time, nullable=False)
     end_time: Mapped[time] = mapped_column(Time, nullable=False)
 
+    # Leading doctor_id also serves per-doctor lookups
     __table_args__ = (
         UniqueConstraint("doctor_id", "weekday", "start_time", "end_time"),
     )
@@ -43,10 +96,39 @@ class BusySlot(Base):
     __tablename__ = "busy_slots"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    doctor_id: Mapped[int] = mapped_column(
+        ForeignKey("doctors.id", ondelete="CASCADE"), nullable=False,
+    )
+    start_dt: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    end_dt: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    reason: Mapped[str | None] = mapped_column(String(255), nullable=True)
+
+    # Serves the overlap query in check_shift (doctor_id = ? AND start_dt < ? AND end_dt > ?)
+    # and the retention sweep (end_dt < ? ORDER BY end_dt)
+    __table_args__ = (
+        Index("ix_busy_slots_doctor_start_end", "doctor_id", "start_dt", "end_dt"),
+        Index("ix_busy_slots_end_dt", "end_dt"),
+    )
+
+
+class BusySlotArchive(Base):
+    """BusySlot that ended before the retention horizon (kept for reporting)."""
+
+    __tablename__ = "busy_slots_archive"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    # Original BusySlot id – not unique, SQLite may hand ids out again
+    source_id: Mapped[int] = mapped_column(Integer, nullable=False)
     doctor_id: Mapped[int] = mapped_column(Integer, nullable=False)
     start_dt: Mapped[datetime] = mapped_column(DateTime, nullable=False)
     end_dt: Mapped[datetime] = mapped_column(DateTime, nullable=False)
     reason: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    archived_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+
+    __table_args__ = (
+        Index("ix_busy_slots_archive_doctor_start", "doctor_id", "start_dt"),
+        Index("ix_busy_slots_archive_source_id", "source_id"),
+    )
 
 
 class RecurringBusyRule(Base):
@@ -55,8 +137,73 @@ class RecurringBusyRule(Base):
     __tablename__ = "recurring_busy_rules"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    doctor_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    doctor_id: Mapped[int] = mapped_column(
+        ForeignKey("doctors.id", ondelete="CASCADE"), nullable=False,
+    )
     weekday: Mapped[int] = mapped_column(Integer, nullable=False)
     start_time: Mapped[time] = mapped_column(Time, nullable=False)
     end_time: Mapped[time] = mapped_column(Time, nullable=False)
     label: Mapped[str | None] = mapped_column(String(100), nullable=True)
+
+    __table_args__ = (
+        Index("ix_recurring_busy_rules_doctor_weekday", "doctor_id", "weekday"),
+    )
+
+
+class OutboundMessage(Base):
+    """WhatsApp message waiting in (or delivered from) the send outbox."""
+
+    __tablename__ = "outbound_messages"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    to_phone: Mapped[str] = mapped_column(String(20), nullable=False)
+    text: Mapped[str] = mapped_column(String(4096), nullable=False)
+    status: Mapped[str] = mapped_column(String(10), nullable=False, default="pending")
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    next_attempt_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    last_error: Mapped[str | None] = mapped_column(String(500), nullable=True)
+    provider_message_id: Mapped[str | None] = mapped_column(String(128), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    sent_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+
+    # Serves the dispatcher's "due pending messages" query
+    __table_args__ = (
+        Index("ix_outbound_messages_status_next_attempt", "status", "next_attempt_at"),
+    )
+
+
+class Lease(Base):
+    """Named lease held by one worker at a time (e.g. the outbox dispatcher)."""
+
+    __tablename__ = "leases"
+
+    name: Mapped[str] = mapped_column(String(64), primary_key=True)
+    holder: Mapped[str] = mapped_column(String(128), nullable=False, default="")
+    expires_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+
+
+class DecisionLog(Base):
+    """Append-only audit record of one /message decision."""
+
+    __tablename__ = "decision_log"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    doctor_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    action: Mapped[str] = mapped_column(String(20), nullable=False)
+    is_offer: Mapped[bool] = mapped_column(Boolean, nullable=False)
+    shift_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    extraction_model: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    decision_model: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    escalation_reason: Mapped[str | None] = mapped_column(String(32), nullable=True)
+    fallback: Mapped[bool] = mapped_column(Boolean, nullable=False)
+    extraction_ms: Mapped[float | None] = mapped_column(Float, nullable=True)
+    schedule_ms: Mapped[float | None] = mapped_column(Float, nullable=True)
+    decision_ms: Mapped[float | None] = mapped_column(Float, nullable=True)
+    total_ms: Mapped[float] = mapped_column(Float, nullable=False)
+    # Full DecisionOut + extraction, for prompt tuning
+    payload: Mapped[dict] = mapped_column(JSON, nullable=False)
+
+    __table_args__ = (
+        Index("ix_decision_log_created_at", "created_at"),
+    )
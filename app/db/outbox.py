@@ -0,0 +1,227 @@
+"""Durable WhatsApp outbox – enqueue on the request path, send in background.
+
+Messages are rows in ``outbound_messages``. The dispatcher claims due rows
+by pushing ``next_attempt_at`` one lease into the future (so a crashed
+worker's messages are picked up again once the lease expires), sends them
+through ``whatsapp_tool.send_message`` and records the outcome. Failures
+are retried with exponential backoff and jitter up to
+``WHATSAPP_MAX_ATTEMPTS``.
+
+The token buckets in ``whatsapp_tool`` live in one process, so with
+several workers only the holder of the ``whatsapp-dispatcher`` lease row
+dispatches; the others stand by and take over once it expires.
+"""
+
+import asyncio
+import logging
+import os
+import random
+import socket
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.ai.tools.whatsapp_tool import (
+    WhatsAppSendError,
+    metrics,
+    rate_limiter,
+    send_message,
+)
+from app.common.config import settings
+from app.db.models import Lease, OutboundMessage
+from app.db.session import async_session
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+SENT = "sent"
+FAILED = "failed"
+
+DISPATCHER_LEASE = "whatsapp-dispatcher"
+_WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def enqueue_message(db: AsyncSession, to: str, text: str) -> OutboundMessage:
+    """Add a message to the outbox; it is sent once the caller commits."""
+    now = datetime.now()
+    message = OutboundMessage(
+        to_phone=to,
+        text=text,
+        status=PENDING,
+        attempts=0,
+        next_attempt_at=now,
+        created_at=now,
+    )
+    db.add(message)
+    return message
+
+
+def _backoff(attempts: int) -> timedelta:
+    delay = min(
+        settings.WHATSAPP_RETRY_MAX_SECONDS,
+        settings.WHATSAPP_RETRY_BASE_SECONDS * 2 ** (attempts - 1),
+    )
+    return timedelta(seconds=delay * random.uniform(0.8, 1.2))
+
+
+async def _claim_batch(batch_size: int) -> list[OutboundMessage]:
+    """Lease up to *batch_size* due messages to this worker.
+
+    The lease is a compare-and-set: a row is only moved forward if it is
+    still due, and only the rows this UPDATE actually changed are returned.
+    Two dispatchers racing for the same rows (SQLite has no row locks;
+    ``FOR UPDATE SKIP LOCKED`` only helps on PostgreSQL) can therefore
+    never both send a message.
+    """
+    now = datetime.now()
+    lease_until = now + timedelta(seconds=settings.WHATSAPP_OUTBOX_LEASE_SECONDS)
+    due = (
+        OutboundMessage.status == PENDING,
+        OutboundMessage.next_attempt_at <= now,
+    )
+    async with async_session() as db:
+        candidate_ids = (
+            await db.execute(
+                select(OutboundMessage.id)
+                .where(*due)
+                .order_by(OutboundMessage.next_attempt_at)
+                .limit(batch_size)
+                .with_for_update(skip_locked=True)
+            )
+        ).scalars().all()
+        if not candidate_ids:
+            return []
+
+        messages = (
+            await db.execute(
+                update(OutboundMessage)
+                .where(OutboundMessage.id.in_(candidate_ids), *due)
+                .values(next_attempt_at=lease_until)
+                .returning(OutboundMessage)
+                .execution_options(synchronize_session=False)
+            )
+        ).scalars().all()
+        await db.commit()
+        return list(messages)
+
+
+async def _deliver(message: OutboundMessage) -> dict:
+    """Send one leased message; return the column updates to persist."""
+    wait = rate_limiter.reserve_number(message.to_phone)
+    if wait > 0:
+        # Per-number limit hit: push back without spending an attempt
+        metrics.rate_limited += 1
+        return {"next_attempt_at": datetime.now() + timedelta(seconds=wait)}
+
+    attempts = message.attempts + 1
+    try:
+        response = await send_message(message.to_phone, message.text)
+    except WhatsAppSendError as exc:
+        if exc.retryable and attempts < settings.WHATSAPP_MAX_ATTEMPTS:
+            metrics.retried += 1
+            return {
+                "attempts": attempts,
+                "last_error": str(exc)[:500],
+                "next_attempt_at": datetime.now() + _backoff(attempts),
+            }
+        metrics.failed += 1
+        logger.warning("Giving up on outbound message %d: %s", message.id, exc)
+        return {"attempts": attempts, "last_error": str(exc)[:500], "status": FAILED}
+    except Exception as exc:
+        # Unknown whether it went out – never resend blindly
+        metrics.failed += 1
+        logger.exception("Unexpected error sending outbound message %d", message.id)
+        return {"attempts": attempts, "last_error": repr(exc)[:500], "status": FAILED}
+
+    metrics.sent += 1
+    provider_ids = response.get("messages") or [{}]
+    return {
+        "attempts": attempts,
+        "status": SENT,
+        "sent_at": datetime.now(),
+        "provider_message_id": provider_ids[0].get("id"),
+        "last_error": None,
+    }
+
+
+async def dispatch_once(batch_size: int | None = None) -> int:
+    """Send one batch of due messages concurrently; return how many were claimed."""
+    messages = await _claim_batch(batch_size or settings.WHATSAPP_OUTBOX_BATCH_SIZE)
+    if not messages:
+        return 0
+
+    # One failing send must not keep the others' outcomes from being saved
+    outcomes = await asyncio.gather(
+        *(_deliver(m) for m in messages), return_exceptions=True,
+    )
+
+    async with async_session() as db:
+        for message, values in zip(messages, outcomes):
+            if isinstance(values, BaseException):
+                logger.error(
+                    "Outbound message %d failed outside delivery", message.id,
+                    exc_info=values,
+                )
+                values = {
+                    "attempts": message.attempts + 1,
+                    "last_error": repr(values)[:500],
+                    "status": FAILED,
+                }
+            await db.execute(
+                update(OutboundMessage)
+                .where(OutboundMessage.id == message.id)
+                .values(**values)
+            )
+        await db.commit()
+    return len(messages)
+
+
+async def hold_dispatcher_lease() -> bool:
+    """Take or renew the dispatcher lease; True if this worker holds it."""
+    now = datetime.now()
+    expires_at = now + timedelta(seconds=settings.WHATSAPP_DISPATCHER_LEASE_SECONDS)
+    async with async_session() as db:
+        result = await db.execute(
+            update(Lease)
+            .where(
+                Lease.name == DISPATCHER_LEASE,
+                (Lease.holder == _WORKER_ID) | (Lease.expires_at < now),
+            )
+            .values(holder=_WORKER_ID, expires_at=expires_at)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount == 1:
+            await db.commit()
+            return True
+        if await db.get(Lease, DISPATCHER_LEASE) is not None:
+            return False  # held by another worker
+
+        # First run: create the row; losing that race means someone else holds it
+        db.add(Lease(name=DISPATCHER_LEASE, holder=_WORKER_ID, expires_at=expires_at))
+        try:
+            await db.commit()
+        except IntegrityError:
+            return False
+        return True
+
+
+async def _outbox_loop(poll_seconds: float) -> None:
+    while True:
+        try:
+            claimed = await dispatch_once() if await hold_dispatcher_lease() else 0
+        except Exception:
+            logger.exception("Outbox dispatch failed")
+            claimed = 0
+        if not claimed:
+            await asyncio.sleep(poll_seconds)
+
+
+def start_outbox_task() -> asyncio.Task | None:
+    """Start the outbox dispatcher (None when disabled or not configured)."""
+    poll_seconds = settings.WHATSAPP_OUTBOX_POLL_SECONDS
+    if poll_seconds <= 0 or not settings.WHATSAPP_PHONE_NUMBER_ID:
+        return None
+    return asyncio.create_task(_outbox_loop(poll_seconds), name="whatsapp-outbox")
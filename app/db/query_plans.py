@@ -0,0 +1,131 @@
+"""Query-plan regression check for the schedule hot paths.
+
+Runs ``EXPLAIN`` (SQLite: ``EXPLAIN QUERY PLAN``) on the queries issued by
+``check_shift`` and by the BusySlot retention sweep, and fails unless each
+one looks rows up through an index (a full table scan, or a walk over a
+whole index, is a regression).
+Works on SQLite and PostgreSQL; on PostgreSQL sequential scans are
+disabled for the session so tiny tables don't hide a missing index.
+
+Run against the configured database with ``python -m app.db.query_plans``
+(exit code 1 on regression, 2 if the schema is not migrated; ``--migrate``
+migrates first). ``tests/test_query_plans.py`` runs the same check.
+"""
+
+import argparse
+import asyncio
+import re
+import sys
+from datetime import datetime, timedelta
+
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncConnection
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+
+class _Explain(Executable, ClauseElement):
+    """``EXPLAIN <stmt>`` as an executable construct (keeps bound params)."""
+
+    inherit_cache = False
+
+    def __init__(self, stmt: Select) -> None:
+        self.stmt = stmt
+
+
+@compiles(_Explain)
+def _compile_explain(element: _Explain, compiler, **kw) -> str:
+    prefix = "EXPLAIN QUERY PLAN " if compiler.dialect.name == "sqlite" else "EXPLAIN "
+    return prefix + compiler.process(element.stmt, **kw)
+
+
+async def explain(conn: AsyncConnection, stmt: Select) -> list[str]:
+    """Return the plan of *stmt* as a list of text lines."""
+    if conn.dialect.name == "postgresql":
+        await conn.exec_driver_sql("SET LOCAL enable_seqscan = off")
+    rows = (await conn.execute(_Explain(stmt))).all()
+    # SQLite: (id, parent, notused, detail); PostgreSQL: (QUERY PLAN,)
+    return [str(row[-1]) for row in rows]
+
+
+def is_index_driven(plan: list[str], column: str) -> bool:
+    """True if *plan* finds its rows through an index condition on *column*.
+
+    SQLite must ``SEARCH`` with *column* in the key – ``SCAN … USING INDEX``
+    still walks the whole index. PostgreSQL must not ``Seq Scan`` and needs
+    an ``Index Cond`` on *column*; an Index Scan without one reads the whole
+    index too (e.g. to satisfy an ORDER BY).
+    """
+    lines = [line.strip() for line in plan]
+    if any(line.startswith("SCAN ") or "Seq Scan" in line for line in lines):
+        return False
+    key = re.compile(rf"\(.*\b{re.escape(column)}\b")
+    return any(
+        line.startswith(("SEARCH ", "Index Cond:")) and key.search(line) for line in lines
+    )
+
+
+def checked_queries() -> dict[str, tuple[Select, str]]:
+    """The hot-path statements, with representative params.
+
+    Each comes with the column its index lookup must be keyed on.
+    """
+    from app.ai.tools.occupancy import availability_query, recurring_busy_query
+    from app.ai.tools.schedule_tool import busy_overlap_query
+    from app.db.retention import expired_slots_query
+
+    start = datetime(2026, 1, 5, 7, 0)
+    return {
+        "availability_rules": (availability_query(1), "doctor_id"),
+        "recurring_busy_rules": (recurring_busy_query(1), "doctor_id"),
+        "busy_overlap": (
+            busy_overlap_query(1, start, start + timedelta(hours=12)), "doctor_id",
+        ),
+        "retention_batch": (expired_slots_query(start - timedelta(days=30), 500), "end_dt"),
+    }
+
+
+async def check_plans(conn: AsyncConnection) -> dict[str, list[str]]:
+    """Explain every checked query; return the plans that are not index-driven."""
+    regressions: dict[str, list[str]] = {}
+    for name, (stmt, column) in checked_queries().items():
+        plan = await explain(conn, stmt)
+        if not is_index_driven(plan, column):
+            regressions[name] = plan
+    return regressions
+
+
+async def _main(apply_migrations: bool) -> int:
+    from app.db.migrations import LATEST_VERSION, migrate, schema_version
+    from app.db.session import engine
+
+    try:
+        if apply_migrations:
+            await migrate(engine)
+        elif (version := await schema_version(engine)) < LATEST_VERSION:
+            print(
+                f"schema is at v{version}, expected v{LATEST_VERSION}; "
+                "run `python -m app.db.migrations` or pass --migrate"
+            )
+            return 2
+        async with engine.begin() as conn:
+            regressions = await check_plans(conn)
+            await conn.rollback()
+    finally:
+        await engine.dispose()
+
+    for name, plan in regressions.items():
+        print(f"{name}: not index-driven")
+        for line in plan:
+            print(f"    {line}")
+    if not regressions:
+        print("all checked queries are index-driven")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--migrate", action="store_true", help="migrate the database before checking",
+    )
+    sys.exit(asyncio.run(_main(parser.parse_args().migrate)))
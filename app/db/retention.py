@@ -0,0 +1,117 @@
+"""BusySlot retention – moves expired slots into ``busy_slots_archive``.
+
+``check_shift`` only looks at the future, so slots that ended before the
+retention horizon are moved out of the hot table. Each batch is its own
+short transaction, so no long locks are held; on PostgreSQL concurrent
+workers skip rows another worker is already archiving.
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta
+
+from sqlalchemy import Select, delete, insert, literal, select
+
+from app.common.config import settings
+from app.db.doctors import bump_schedule_version
+from app.db.models import BusySlot, BusySlotArchive
+from app.db.session import async_session
+
+logger = logging.getLogger(__name__)
+
+
+def retention_cutoff() -> datetime:
+    """Slots ending before this moment are due for (or already in) the archive."""
+    return datetime.now() - timedelta(days=settings.BUSY_SLOT_RETENTION_DAYS)
+
+
+def expired_slots_query(cutoff: datetime, batch_size: int) -> Select:
+    """Up to *batch_size* BusySlots ending before *cutoff*, oldest first.
+
+    Walks ``ix_busy_slots_end_dt`` in order, so a batch reads only the rows
+    it returns.
+    """
+    return (
+        select(BusySlot.id, BusySlot.doctor_id)
+        .where(BusySlot.end_dt < cutoff)
+        .order_by(BusySlot.end_dt)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+
+
+async def _archive_batch(cutoff: datetime, batch_size: int) -> int:
+    """Move up to *batch_size* slots ending before *cutoff*; return the count."""
+    async with async_session() as db:
+        rows = (await db.execute(expired_slots_query(cutoff, batch_size))).all()
+        if not rows:
+            return 0
+        ids = [row.id for row in rows]
+
+        await db.execute(
+            insert(BusySlotArchive).from_select(
+                ["source_id", "doctor_id", "start_dt", "end_dt", "reason", "archived_at"],
+                select(
+                    BusySlot.id,
+                    BusySlot.doctor_id,
+                    BusySlot.start_dt,
+                    BusySlot.end_dt,
+                    BusySlot.reason,
+                    literal(datetime.now(), BusySlotArchive.archived_at.type),
+                ).where(BusySlot.id.in_(ids)),
+            )
+        )
+        await db.execute(delete(BusySlot).where(BusySlot.id.in_(ids)))
+        await bump_schedule_version(db, (row.doctor_id for row in rows))
+        await db.commit()
+        return len(ids)
+
+
+async def archive_busy_slots(
+    retention_days: int | None = None,
+    batch_size: int | None = None,
+) -> int:
+    """Archive every BusySlot that ended more than *retention_days* ago.
+
+    Args:
+        retention_days: Horizon in days (defaults to BUSY_SLOT_RETENTION_DAYS).
+        batch_size: Rows per transaction (defaults to BUSY_SLOT_ARCHIVE_BATCH_SIZE).
+
+    Returns:
+        Number of slots moved to the archive.
+    """
+    if batch_size is None:
+        batch_size = settings.BUSY_SLOT_ARCHIVE_BATCH_SIZE
+
+    if retention_days is None:
+        cutoff = retention_cutoff()
+    else:
+        cutoff = datetime.now() - timedelta(days=retention_days)
+    total = 0
+    while True:
+        moved = await _archive_batch(cutoff, batch_size)
+        total += moved
+        if moved < batch_size:
+            break
+        await asyncio.sleep(0)  # let request handlers run between batches
+
+    if total:
+        logger.info("Archived %d busy slots ending before %s", total, cutoff.isoformat())
+    return total
+
+
+async def _retention_loop(interval: int) -> None:
+    while True:
+        try:
+            await archive_busy_slots()
+        except Exception:
+            logger.exception("BusySlot retention run failed")
+        await asyncio.sleep(interval)
+
+
+def start_retention_task() -> asyncio.Task | None:
+    """Start the periodic retention task (None when disabled)."""
+    interval = settings.BUSY_SLOT_ARCHIVE_INTERVAL_SECONDS
+    if interval <= 0:
+        return None
+    return asyncio.create_task(_retention_loop(interval), name="busy-slot-retention")
@@ -1,15 +1,105 @@
-"""Async SQLAlchemy engine and session factory."""
+"""Async SQLAlchemy engines and session factories.
 
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+Writes go through ``engine`` (the primary). When ``DATABASE_READ_URL`` is
+set, read-only paths use ``read_engine`` (e.g. a PostgreSQL replica);
+otherwise – and always on SQLite – both names point at the same engine.
+"""
+
+from fastapi import Depends
+from sqlalchemy import event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 
 from app.common.config import settings
 
-engine = create_async_engine(settings.DATABASE_URL, echo=False)
+
+def _is_sqlite(url: str) -> bool:
+    return make_url(url).get_backend_name() == "sqlite"
+
+
+def _create_engine(url: str) -> AsyncEngine:
+    """Create an engine; pool settings only apply to server databases."""
+    if _is_sqlite(url):
+        sqlite_engine = create_async_engine(url, echo=False)
+
+        @event.listens_for(sqlite_engine.sync_engine, "connect")
+        def _enable_sqlite_foreign_keys(dbapi_connection, _record) -> None:
+            """SQLite ignores foreign keys unless enabled per connection."""
+            cursor = dbapi_connection.cursor()
+            cursor.execute("PRAGMA foreign_keys=ON")
+            cursor.close()
+
+        return sqlite_engine
+
+    return create_async_engine(
+        url,
+        echo=False,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+    )
+
+
+engine = _create_engine(settings.DATABASE_URL)
+
+if settings.DATABASE_READ_URL and not _is_sqlite(settings.DATABASE_URL):
+    read_engine = _create_engine(settings.DATABASE_READ_URL)
+else:
+    read_engine = engine
 
 async_session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
+read_session = async_sessionmaker(read_engine, class_=AsyncSession, expire_on_commit=False)
+
 
 async def get_db() -> AsyncSession:  # type: ignore[misc]
-    """FastAPI dependency – yields an async session."""
+    """FastAPI dependency – yields an async session on the primary."""
     async with async_session() as session:
         yield session
+
+
+async def get_read_db(
+    db: AsyncSession = Depends(get_db),
+) -> AsyncSession:  # type: ignore[misc]
+    """FastAPI dependency – yields a session for read-only work (may lag).
+
+    Without a replica this is the request's primary session, so a request
+    never holds two connections (sessions connect lazily).
+    """
+    if read_engine is engine:
+        yield db
+        return
+    async with read_session() as session:
+        yield session
+
+
+async def dispose_engines() -> None:
+    """Close every pooled connection (primary and replica)."""
+    await engine.dispose()
+    if read_engine is not engine:
+        await read_engine.dispose()
+
+
+async def _warm_up_engine(target: AsyncEngine) -> None:
+    count = 1 if target.dialect.name == "sqlite" else settings.DB_POOL_SIZE
+    connections = [await target.connect() for _ in range(count)]
+    try:
+        for conn in connections:
+            await conn.execute(text("SELECT 1"))
+    finally:
+        for conn in connections:
+            await conn.close()  # back into the pool, still open
+
+
+async def warm_up_engines() -> None:
+    """Fill the connection pools so the first requests skip connection setup."""
+    await _warm_up_engine(engine)
+    if read_engine is not engine:
+        await _warm_up_engine(read_engine)
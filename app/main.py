@@ -1,28 +1,107 @@
 """FastAPI application entry point."""
 
-from contextlib import asynccontextmanager
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager, suppress
 
 from fastapi import FastAPI
-from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
+from fastapi.responses import JSONResponse
 
+from app.ai.tools.whatsapp_tool import close_client
+from app.ai.warmup import warm_up_llm
+from app.api.controllers.admin_controller import router as admin_router
 from app.api.controllers.message_controller import router as message_router
 from app.api.controllers.schedule_controller import router as schedule_router
 from app.common.config import settings
-from app.common.tracing import setup_tracing
-from app.db.models import Base
-from app.db.session import engine
+from app.common.logs import setup_logging
+from app.common.tracing import instrument_app, setup_tracing
+from app.db.decision_log import decision_log
+from app.db.invalidation import invalidation_bus
+from app.db.migrations import LATEST_VERSION, migrate, schema_version
+from app.db.outbox import start_outbox_task
+from app.db.retention import start_retention_task
+from app.db.session import dispose_engines, engine, warm_up_engines
+
+logger = logging.getLogger(__name__)
+
+
+async def _prepare_schema() -> None:
+    """Check the schema version; migrate only when it is behind."""
+    version = await schema_version(engine)
+    if version >= LATEST_VERSION:
+        return
+    if not settings.DB_AUTO_MIGRATE:
+        raise RuntimeError(
+            f"Database schema is at v{version}, expected v{LATEST_VERSION}. "
+            "Run `python -m app.db.migrations`."
+        )
+    await migrate(engine)
+
+
+async def _warm_up(app: FastAPI, timings: dict[str, float], started: float) -> None:
+    """Pre-open DB and LLM connections, then mark the app ready."""
+    for name, step in (("warmup_db", warm_up_engines), ("warmup_llm", warm_up_llm)):
+        step_started = time.perf_counter()
+        try:
+            await step()
+        except Exception:
+            logger.warning("Startup step '%s' failed", name, exc_info=True)
+        timings[name] = time.perf_counter() - step_started
+    _mark_ready(app, timings, started)
+
+
+def _mark_ready(app: FastAPI, timings: dict[str, float], started: float) -> None:
+    app.state.ready = True
+    timings["total"] = time.perf_counter() - started
+    logger.info(
+        "Startup complete: %s",
+        ", ".join(f"{name}={seconds * 1000:.0f}ms" for name, seconds in timings.items()),
+    )
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Create tables on startup, dispose engine on shutdown."""
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    """Check the schema and start background tasks; clean up on shutdown.
+
+    With STARTUP_WARMUP the DB pool and LLM client are warmed in the
+    background and /health/ready reports 503 until that finishes.
+    """
+    app.state.ready = False
+    started = time.perf_counter()
+    timings: dict[str, float] = {}
+
+    await _prepare_schema()
+    timings["schema"] = time.perf_counter() - started
+
+    await invalidation_bus.start()
+    if settings.DECISION_LOG_ENABLED:
+        decision_log.start()
+    retention_task = start_retention_task()
+    outbox_task = start_outbox_task()
+
+    warmup_task = None
+    if settings.STARTUP_WARMUP:
+        warmup_task = asyncio.create_task(_warm_up(app, timings, started), name="warmup")
+    else:
+        _mark_ready(app, timings, started)
+
     yield
-    await engine.dispose()
 
+    app.state.ready = False
+    for task in (warmup_task, retention_task, outbox_task):
+        if task is not None:
+            task.cancel()
+            with suppress(asyncio.CancelledError):
+                await task
+    await invalidation_bus.stop()
+    await decision_log.stop()
+    await close_client()
+    await dispose_engines()
 
-# Initialise tracing before app is created
+
+# Initialise logging and tracing before app is created
+setup_logging()
 setup_tracing()
 
 app = FastAPI(
@@ -33,14 +112,24 @@ app = FastAPI(
 )
 
 # Instrument FastAPI with OpenTelemetry
-FastAPIInstrumentor.instrument_app(app)
+instrument_app(app)
 
 # Register routers
 app.include_router(message_router, tags=["message"])
 app.include_router(schedule_router, tags=["schedule"])
+app.include_router(admin_router, tags=["admin"])
 
 
 @app.get("/health")
+@app.get("/health/live")
 async def health():
-    """Simple health-check endpoint."""
+    """Liveness: the process is up and serving requests."""
     return {"status": "ok", "env": settings.APP_ENV}
+
+
+@app.get("/health/ready")
+async def health_ready():
+    """Readiness: schema checked and warm-up finished (503 until then)."""
+    if not getattr(app.state, "ready", False):
+        return JSONResponse(status_code=503, content={"status": "starting"})
+    return {"status": "ready", "env": settings.APP_ENV}
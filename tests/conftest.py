@@ -0,0 +1,58 @@
+"""Shared test setup: a throwaway SQLite database for the app's engine.
+
+``app.db.session`` builds its engine from ``DATABASE_URL`` at import time,
+so the URL is forced here, before any test module imports the app.
+"""
+
+import asyncio
+import os
+import tempfile
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+import pytest
+
+_DB_DIR = tempfile.mkdtemp(prefix="plantao-tests-")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_DB_DIR}/app.db"
+os.environ["DATABASE_READ_URL"] = ""
+os.environ["CACHE_INVALIDATION_BACKEND"] = "poll"
+
+
+def _drop_everything(conn) -> None:
+    from sqlalchemy import MetaData
+
+    metadata = MetaData()
+    metadata.reflect(conn)
+    metadata.drop_all(conn)
+
+
+def _clear_caches() -> None:
+    from app.ai.tools import occupancy
+    from app.db import doctors
+
+    occupancy._occupancy_cache.clear()
+    doctors._by_phone.clear()
+    doctors._known_ids.clear()
+
+
+@pytest.fixture
+def run_on_fresh_db() -> Callable[[Callable[[], Awaitable[Any]]], Any]:
+    """Run an async scenario against a freshly migrated app database."""
+    from app.db.migrations import migrate
+    from app.db.session import engine
+
+    def run(scenario: Callable[[], Awaitable[Any]]) -> Any:
+        async def main() -> Any:
+            async with engine.begin() as conn:
+                await conn.run_sync(_drop_everything)
+            await migrate(engine)
+            _clear_caches()
+            try:
+                return await scenario()
+            finally:
+                # Pooled aiosqlite connections are tied to this event loop
+                await engine.dispose()
+
+        return asyncio.run(main())
+
+    return run
@@ -0,0 +1,97 @@
+"""Cross-worker cache invalidation on a shared SQLite file."""
+
+from datetime import time
+
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.ai.tools import occupancy
+from app.common.cache import MISSING
+from app.db import doctors
+from app.db.doctors import bump_schedule_version, get_doctor_id_by_phone
+from app.db.invalidation import InvalidationBus
+from app.db.models import AvailabilityRule, Doctor
+from app.db.session import async_session, engine, read_session
+
+PHONE = "+5511900000001"
+
+
+def test_poll_drops_caches_filled_before_another_workers_write(run_on_fresh_db):
+    async def scenario():
+        async with async_session() as db:
+            db.add(Doctor(id=1, name="Dra. Ana", phone=PHONE))
+            await db.commit()
+
+        # This worker: caches filled, bus watermark taken
+        bus = InvalidationBus(backend="poll", poll_seconds=3600, repoll_seconds=30)
+        await bus.start()
+        async with read_session() as db:
+            assert await get_doctor_id_by_phone(db, PHONE) == 1
+            before = await occupancy.get_weekly_occupancy(db, 1)
+        assert not before.has_availability(0)
+
+        # Another worker writes through its own engine
+        other_engine = create_async_engine(engine.url)
+        try:
+            async with async_sessionmaker(other_engine)() as db:
+                db.add(AvailabilityRule(
+                    doctor_id=1, weekday=0, start_time=time(7), end_time=time(19),
+                ))
+                await bump_schedule_version(db, 1)
+                await db.commit()
+        finally:
+            await other_engine.dispose()
+
+        stale = (occupancy._occupancy_cache.get(1) is not MISSING, doctors._by_phone.get(PHONE))
+        try:
+            invalidated = await bus.poll_once()
+        finally:
+            await bus.stop()
+
+        async with read_session() as db:
+            after = await occupancy.get_weekly_occupancy(db, 1)
+        dropped = (doctors._by_phone.get(PHONE), doctors._known_ids.get(1))
+        return stale, invalidated, dropped, after
+
+    (cached_occupancy, cached_phone), invalidated, dropped, after = run_on_fresh_db(scenario)
+    assert cached_occupancy and cached_phone == 1
+    assert invalidated == 1
+    assert dropped == (MISSING, MISSING)
+    assert after.has_availability(0)
+
+
+def test_poll_catches_a_change_that_commits_out_of_order(run_on_fresh_db):
+    async def scenario():
+        async with async_session() as db:
+            db.add_all([
+                Doctor(id=1, name="Dra. Ana", phone=PHONE),
+                Doctor(id=2, name="Dr. Bruno", phone="+5511900000002"),
+            ])
+            await db.commit()
+
+        bus = InvalidationBus(backend="poll", poll_seconds=3600, repoll_seconds=30)
+        await bus.start()
+
+        async def stamp(doctor_id: int, seq: int) -> None:
+            async with async_session() as db:
+                await db.execute(
+                    update(Doctor).where(Doctor.id == doctor_id).values(changed_seq=seq)
+                )
+                await db.commit()
+
+        try:
+            await stamp(2, 11)  # the later number commits first
+            first = await bus.poll_once()
+            async with read_session() as db:
+                await get_doctor_id_by_phone(db, PHONE)
+            await stamp(1, 10)
+            late = await bus.poll_once()
+            again = await bus.poll_once()
+        finally:
+            await bus.stop()
+        return first, late, again, bus.watermark, doctors._by_phone.get(PHONE)
+
+    first, late, again, watermark, cached = run_on_fresh_db(scenario)
+    assert (first, late, again) == (1, 1, 0)
+    assert watermark == 11
+    assert cached is MISSING
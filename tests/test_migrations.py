@@ -0,0 +1,86 @@
+"""Upgrading a pre-foreign-key (v1) SQLite database."""
+
+import asyncio
+
+from sqlalchemy import Column, MetaData, Table, inspect, select
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.db import migrations
+from app.db.models import AvailabilityRule, BusySlot, Doctor, RecurringBusyRule
+
+_LEGACY_TABLES = (AvailabilityRule, BusySlot, RecurringBusyRule)
+
+
+def _create_v1_schema(conn) -> None:
+    """The schedule tables as create_all made them before v2: no FKs, no indexes."""
+    legacy = MetaData()
+    Doctor.__table__.to_metadata(legacy)
+    for model in _LEGACY_TABLES:
+        table = model.__table__
+        Table(
+            table.name,
+            legacy,
+            *(Column(c.name, c.type, primary_key=c.primary_key) for c in table.columns),
+        )
+    legacy.create_all(conn)
+    migrations.schema_version_table.create(conn)
+    conn.execute(migrations.schema_version_table.insert().values(version=1))
+    conn.exec_driver_sql(
+        "INSERT INTO doctors (id, name, phone, schedule_version, changed_seq) "
+        "VALUES (1, 'Dra. Ana', '+5511900000001', 0, 0)"
+    )
+    for doctor_id in (1, 99):
+        conn.exec_driver_sql(
+            "INSERT INTO busy_slots (doctor_id, start_dt, end_dt, reason) VALUES "
+            f"({doctor_id}, '2025-01-06 08:00:00', '2025-01-06 12:00:00', 'plantão')"
+        )
+
+
+def _describe(conn) -> dict:
+    inspector = inspect(conn)
+    return {
+        "foreign_keys": {
+            model.__tablename__: bool(inspector.get_foreign_keys(model.__tablename__))
+            for model in _LEGACY_TABLES
+        },
+        "busy_doctors": sorted(
+            conn.execute(select(BusySlot.__table__.c.doctor_id)).scalars().all()
+        ),
+        "version": migrations._read_version(conn),
+    }
+
+
+async def _upgrade(url: str) -> dict:
+    engine = create_async_engine(url)
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(_create_v1_schema)
+        try:
+            await migrations.migrate(engine)
+        except RuntimeError:
+            pass
+        async with engine.connect() as conn:
+            return await conn.run_sync(_describe)
+    finally:
+        await engine.dispose()
+
+
+def test_v2_adds_foreign_keys_and_drops_orphans(tmp_path):
+    state = asyncio.run(_upgrade(f"sqlite+aiosqlite:///{tmp_path / 'v1.db'}"))
+    assert state["version"] == migrations.LATEST_VERSION
+    assert all(state["foreign_keys"].values())
+    assert state["busy_doctors"] == [1]
+
+
+def test_failed_upgrade_rolls_back_table_rebuilds(tmp_path, monkeypatch):
+    def explode(_conn) -> None:
+        raise RuntimeError("migration bug")
+
+    broken = [*migrations.MIGRATIONS, (99, "broken", explode)]
+    monkeypatch.setattr(migrations, "MIGRATIONS", broken)
+    monkeypatch.setattr(migrations, "LATEST_VERSION", 99)
+
+    state = asyncio.run(_upgrade(f"sqlite+aiosqlite:///{tmp_path / 'v1.db'}"))
+    assert state["version"] == 1
+    assert not any(state["foreign_keys"].values())
+    assert state["busy_doctors"] == [1, 99]
@@ -0,0 +1,106 @@
+"""Weekly occupancy masks: slot rounding, wrapping rules and exact edges."""
+
+from datetime import datetime, time
+
+import pytest
+
+from app.ai.tools.occupancy import (
+    SLOTS_PER_DAY,
+    SLOTS_PER_WEEK,
+    _slot_mask,
+    build_weekly_occupancy,
+    day_segments,
+    rule_mask,
+    shift_span,
+)
+from app.db.models import AvailabilityRule, RecurringBusyRule
+
+WEEK_MIN = 7 * 24 * 60
+MON = datetime(2026, 1, 5)  # a Monday
+
+
+def _at(hour: int, minute: int = 0) -> datetime:
+    return MON.replace(hour=hour, minute=minute)
+
+
+def _bits(first: int, last: int) -> int:
+    """Mask with slots ``first .. last - 1`` set."""
+    return ((1 << (last - first)) - 1) << first
+
+
+def test_slot_mask_rounds_inward_for_availability_and_outward_for_shifts():
+    # 07:03–13:00 on Monday: slot 84 is 07:00–07:05
+    assert _slot_mask(423, 780, inner=True) == _bits(85, 156)
+    assert _slot_mask(423, 780, inner=False) == _bits(84, 156)
+    assert _slot_mask(423, 782, inner=False) == _bits(84, 157)
+
+
+def test_slot_mask_handles_empty_wrapping_and_whole_week_ranges():
+    assert _slot_mask(423, 424, inner=True) == 0
+    assert _slot_mask(WEEK_MIN - 10, WEEK_MIN + 10, inner=False) == (
+        _bits(SLOTS_PER_WEEK - 2, SLOTS_PER_WEEK) | _bits(0, 2)
+    )
+    assert _slot_mask(0, 2 * WEEK_MIN, inner=False) == _bits(0, SLOTS_PER_WEEK)
+
+
+def test_rule_mask_runs_into_the_next_day_when_end_is_not_after_start():
+    overnight = rule_mask(0, time(19), time(7))  # Monday 19:00 → Tuesday 07:00
+    assert overnight == _bits(19 * 12, SLOTS_PER_DAY + 7 * 12)
+    assert rule_mask(0, time(8), time(8)) == _bits(8 * 12, SLOTS_PER_DAY + 8 * 12)
+    # Sunday night wraps to Monday morning
+    assert rule_mask(6, time(22), time(2)) == (
+        _bits(SLOTS_PER_WEEK - 2 * 12, SLOTS_PER_WEEK) | _bits(0, 2 * 12)
+    )
+
+
+@pytest.mark.parametrize(
+    ("start", "end", "expected"),
+    [
+        (MON.replace(hour=7), MON.replace(hour=19), [(7, 19)]),
+        (MON.replace(hour=19), MON.replace(day=6, hour=7), [(19, 24), (0, 7)]),
+        (MON, MON.replace(day=6), [(0, 24)]),
+        (MON.replace(hour=7), MON.replace(day=7, hour=7), [(7, 24), (0, 24), (0, 7)]),
+        (MON, MON, []),
+    ],
+)
+def test_day_segments_split_at_midnight(start, end, expected):
+    hours = [
+        (piece_start.hour, 24 if piece_end.time() == time() else piece_end.hour)
+        for piece_start, piece_end in day_segments(start, end)
+    ]
+    assert hours == expected
+
+
+def _occupancy(availability=(), busy=()):
+    return build_weekly_occupancy(
+        [AvailabilityRule(weekday=w, start_time=s, end_time=e) for w, s, e in availability],
+        [
+            RecurringBusyRule(weekday=w, start_time=s, end_time=e, label=label)
+            for w, s, e, label in busy
+        ],
+    )
+
+
+def test_off_grid_availability_covers_a_shift_starting_at_the_same_minute():
+    occupancy = _occupancy(availability=[(0, time(7, 3), time(19, 3))])
+    assert occupancy.covers(*shift_span(_at(7, 3), _at(19, 3)))
+    assert not occupancy.covers(*shift_span(_at(7, 2), _at(19)))
+    assert not occupancy.covers(*shift_span(_at(8), _at(19, 4)))
+
+
+def test_adjacent_availability_windows_cover_a_shift_across_both():
+    occupancy = _occupancy(availability=[(0, time(7), time(12, 3)), (0, time(12, 3), time(19))])
+    assert occupancy.covers(*shift_span(_at(7), _at(19)))
+
+
+def test_off_grid_busy_block_only_conflicts_when_minutes_overlap():
+    occupancy = _occupancy(busy=[(0, time(12, 3), time(13), "Almoço")])
+    assert occupancy.conflict(*shift_span(_at(7), _at(12, 3))) is None
+    assert occupancy.conflict(*shift_span(_at(7), _at(12, 4))) == "Almoço"
+    assert occupancy.conflict(*shift_span(_at(13), _at(19))) is None
+
+
+def test_sunday_night_busy_rule_conflicts_with_monday_morning():
+    occupancy = _occupancy(busy=[(6, time(22), time(2), "Sobreaviso")])
+    assert occupancy.conflict(*shift_span(_at(1), _at(7))) == "Sobreaviso"
+    assert occupancy.conflict(*shift_span(_at(2), _at(7))) is None
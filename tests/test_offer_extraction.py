@@ -0,0 +1,100 @@
+"""Offer extraction cascade: escalation rules and the strict parse path."""
+
+import asyncio
+from datetime import date
+from types import SimpleNamespace
+
+import pytest
+
+from app.ai.run_trace import run_trace
+from app.ai.schemas import OfferExtraction
+from app.ai.skills.offer_extraction import skill
+from app.common.config import settings
+
+SHIFT = {"date": "2026-01-05", "shift_type": "diurno"}
+
+
+@pytest.fixture(autouse=True)
+def _cascade_settings(monkeypatch):
+    monkeypatch.setattr(settings, "OFFER_CASCADE_ENABLED", True)
+    monkeypatch.setattr(settings, "OFFER_FAST_MODEL", "fast")
+    monkeypatch.setattr(settings, "OFFER_STRONG_MODEL", "strong")
+    monkeypatch.setattr(settings, "OFFER_CASCADE_MIN_CONFIDENCE", 0.8)
+    monkeypatch.setattr(settings, "OFFER_CASCADE_MAX_FAST_SHIFTS", 1)
+    monkeypatch.setattr(
+        settings, "OFFER_CASCADE_ESCALATE_ON", "low_confidence,multi_shift,missing_shifts",
+    )
+
+
+@pytest.mark.parametrize(
+    ("data", "reason"),
+    [
+        ({"is_offer": True, "shifts": [SHIFT], "confidence": 0.95}, None),
+        ({"is_offer": False, "confidence": 0.9}, None),
+        ({"is_offer": True, "shifts": [SHIFT]}, skill.LOW_CONFIDENCE),  # omitted ≠ 1.0
+        ({"is_offer": True, "shifts": [SHIFT], "confidence": 0.5}, skill.LOW_CONFIDENCE),
+        ({"is_offer": True, "shifts": [SHIFT, SHIFT], "confidence": 0.9}, skill.MULTI_SHIFT),
+        ({"is_offer": True, "confidence": 0.9}, skill.MISSING_SHIFTS),
+    ],
+)
+def test_escalation_reason(data, reason):
+    assert skill._escalation_reason(OfferExtraction.model_validate(data)) == reason
+
+
+def test_escalation_metrics_can_be_switched_off(monkeypatch):
+    monkeypatch.setattr(settings, "OFFER_CASCADE_ESCALATE_ON", "missing_shifts")
+    extraction = OfferExtraction.model_validate({"is_offer": True, "shifts": [SHIFT, SHIFT]})
+    assert skill._escalation_reason(extraction) is None
+
+
+def test_strict_parse_rejects_output_without_json():
+    assert skill._coerce("Não é uma oferta.").is_offer is False
+    with pytest.raises(ValueError):
+        skill._coerce("Não é uma oferta.", strict=True)
+
+
+def test_strict_parse_accepts_json_wrapped_in_text():
+    text = 'Claro: {"is_offer": true, "shifts": [{"date": "2026-01-05", "shift_type": "diurno"}]}'
+    extraction = skill._coerce(text, strict=True)
+    assert extraction.shifts[0].date == date(2026, 1, 5)
+
+
+class _FakeAgent:
+    """Stands in for agno's Agent; answers ``arun`` with canned content."""
+
+    def __init__(self, content: object) -> None:
+        self.content = content
+
+    async def arun(self, _message: str) -> SimpleNamespace:
+        if isinstance(self.content, Exception):
+            raise self.content
+        return SimpleNamespace(content=self.content, metrics=None)
+
+
+def _run(monkeypatch, answers: dict[str, object]) -> tuple[OfferExtraction, object]:
+    monkeypatch.setattr(
+        skill, "_build_agent", lambda model_id=None: _FakeAgent(answers[model_id]),
+    )
+
+    async def main():
+        with run_trace() as trace:
+            extraction = await skill.run_offer_extraction("Plantão segunda 05/01, aceita?")
+        return extraction, trace
+
+    return asyncio.run(main())
+
+
+def test_fast_tier_answer_is_used_when_confident(monkeypatch):
+    fast = {"is_offer": True, "shifts": [SHIFT], "confidence": 0.95}
+    extraction, trace = _run(monkeypatch, {"fast": fast, "strong": RuntimeError("unused")})
+    assert extraction.is_offer and trace.models["offer_extraction"] == "fast"
+    assert trace.escalation is None
+
+
+@pytest.mark.parametrize("fast", ["sem JSON aqui", RuntimeError("timeout")])
+def test_unusable_fast_answer_escalates_with_schema_error(monkeypatch, fast):
+    strong = OfferExtraction.model_validate({"is_offer": True, "shifts": [SHIFT]})
+    extraction, trace = _run(monkeypatch, {"fast": fast, "strong": strong})
+    assert extraction is strong
+    assert trace.escalation == skill.SCHEMA_ERROR
+    assert trace.models["offer_extraction"] == "strong"
@@ -0,0 +1,163 @@
+"""Outbox dispatch against a local Cloud API stand-in (no network)."""
+
+import asyncio
+from datetime import datetime
+
+import httpx
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.ai.tools import whatsapp_stub, whatsapp_tool
+from app.ai.tools.whatsapp_tool import RateLimiter
+from app.db import outbox
+from app.db.models import OutboundMessage
+from app.db.session import async_session, engine
+
+
+@pytest.fixture(autouse=True)
+def _fresh_limits(monkeypatch):
+    monkeypatch.setattr(outbox, "rate_limiter", RateLimiter(1000, 1000, 1000, 1000))
+    monkeypatch.setattr(whatsapp_tool, "rate_limiter", RateLimiter(1000, 1000, 1000, 1000))
+    monkeypatch.setattr(whatsapp_tool.settings, "WHATSAPP_PHONE_NUMBER_ID", "stub")
+    yield
+    whatsapp_tool._client = None
+
+
+def _use_transport(transport: httpx.AsyncBaseTransport) -> None:
+    whatsapp_tool._client = httpx.AsyncClient(transport=transport, base_url="http://stub")
+
+
+def _reply(status: int, **kwargs) -> httpx.MockTransport:
+    return httpx.MockTransport(lambda _request: httpx.Response(status, **kwargs))
+
+
+async def _enqueue(*phones: str) -> None:
+    async with async_session() as db:
+        for phone in phones:
+            outbox.enqueue_message(db, phone, "Obrigado!")
+        await db.commit()
+
+
+async def _messages() -> dict[str, OutboundMessage]:
+    async with async_session() as db:
+        rows = (await db.execute(select(OutboundMessage))).scalars().all()
+    return {row.to_phone: row for row in rows}
+
+
+def test_sends_through_stub(run_on_fresh_db):
+    async def scenario():
+        _use_transport(httpx.ASGITransport(app=whatsapp_stub.app))
+        await _enqueue("+5511900000001", "+5511900000002")
+        assert await outbox.dispatch_once() == 2
+        return await _messages()
+
+    messages = run_on_fresh_db(scenario)
+    assert {m.status for m in messages.values()} == {outbox.SENT}
+    assert all(m.provider_message_id.startswith("wamid.stub.") for m in messages.values())
+
+
+def test_503_is_retried_later(run_on_fresh_db):
+    async def scenario():
+        _use_transport(_reply(503, json={"error": "busy"}))
+        await _enqueue("+5511900000001")
+        await outbox.dispatch_once()
+        return (await _messages())["+5511900000001"]
+
+    message = run_on_fresh_db(scenario)
+    assert message.status == outbox.PENDING
+    assert message.attempts == 1
+    assert message.next_attempt_at > datetime.now()
+    assert "HTTP 503" in message.last_error
+
+
+def test_4xx_fails_without_retry(run_on_fresh_db):
+    async def scenario():
+        _use_transport(_reply(400, json={"error": "bad number"}))
+        await _enqueue("+5511900000001")
+        await outbox.dispatch_once()
+        return (await _messages())["+5511900000001"]
+
+    message = run_on_fresh_db(scenario)
+    assert message.status == outbox.FAILED
+    assert message.attempts == 1
+
+
+def test_per_number_limit_reschedules_without_spending_an_attempt(run_on_fresh_db, monkeypatch):
+    monkeypatch.setattr(outbox, "rate_limiter", RateLimiter(1000, 1000, 0.01, 1))
+
+    async def scenario():
+        _use_transport(httpx.ASGITransport(app=whatsapp_stub.app))
+        await _enqueue("+5511900000001", "+5511900000001")
+        await outbox.dispatch_once()
+        async with async_session() as db:
+            return (await db.execute(select(OutboundMessage))).scalars().all()
+
+    first, second = sorted(run_on_fresh_db(scenario), key=lambda m: m.status)
+    assert (first.status, second.status) == (outbox.PENDING, outbox.SENT)
+    assert first.attempts == 0
+    assert first.next_attempt_at > datetime.now()
+
+
+def test_outcomes_are_saved_when_one_send_raises(run_on_fresh_db, monkeypatch):
+    async def send_message(to: str, text: str) -> dict:
+        if to == "+5511900000001":
+            raise RuntimeError("boom")
+        return {"messages": [{"id": "wamid.ok"}]}
+
+    monkeypatch.setattr(outbox, "send_message", send_message)
+
+    async def scenario():
+        await _enqueue("+5511900000001", "+5511900000002")
+        await outbox.dispatch_once()
+        return await _messages()
+
+    messages = run_on_fresh_db(scenario)
+    assert messages["+5511900000001"].status == outbox.FAILED
+    assert messages["+5511900000002"].status == outbox.SENT
+    assert messages["+5511900000002"].provider_message_id == "wamid.ok"
+
+
+def test_non_json_2xx_is_not_resent(run_on_fresh_db):
+    async def scenario():
+        _use_transport(_reply(200, text="<html>proxy</html>"))
+        await _enqueue("+5511900000001")
+        await outbox.dispatch_once()
+        return (await _messages())["+5511900000001"]
+
+    assert run_on_fresh_db(scenario).status == outbox.FAILED
+
+
+def test_concurrent_claims_never_overlap(run_on_fresh_db, monkeypatch):
+    async def scenario():
+        await _enqueue(*(f"+55119000000{i:02d}" for i in range(20)))
+        other_engine = create_async_engine(engine.url)
+        other = async_sessionmaker(other_engine, expire_on_commit=False)
+
+        async def claim(factory):
+            monkeypatch.setattr(outbox, "async_session", factory)
+            return {m.id for m in await outbox._claim_batch(15)}
+
+        try:
+            first, second = await asyncio.gather(claim(async_session), claim(other))
+        finally:
+            monkeypatch.setattr(outbox, "async_session", async_session)
+            await other_engine.dispose()
+        # A claimer that lost the race gets nothing now and the rest next round
+        rest = await claim(async_session)
+        return first, second, rest
+
+    first, second, rest = run_on_fresh_db(scenario)
+    assert not first & second
+    assert not (first | second) & rest
+    assert len(first | second | rest) == 20
+
+
+def test_only_one_worker_holds_the_dispatcher_lease(run_on_fresh_db, monkeypatch):
+    async def scenario():
+        held = [await outbox.hold_dispatcher_lease()]
+        monkeypatch.setattr(outbox, "_WORKER_ID", "other-worker")
+        held.append(await outbox.hold_dispatcher_lease())
+        return held
+
+    assert run_on_fresh_db(scenario) == [True, False]
@@ -0,0 +1,78 @@
+"""The hot-path queries must stay index-driven (EXPLAIN regression test).
+
+The SQLite case runs against a throwaway database. Set
+``TEST_POSTGRES_URL`` (e.g. ``postgresql+asyncpg://…/plantao_test``) to
+also check PostgreSQL; that database gets migrated, so point it at a
+disposable one.
+"""
+
+import asyncio
+import os
+
+import pytest
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.db.migrations import migrate
+from app.db.query_plans import check_plans, is_index_driven
+
+
+async def _regressions(url: str) -> dict[str, list[str]]:
+    engine = create_async_engine(url)
+    try:
+        await migrate(engine)
+        async with engine.begin() as conn:
+            regressions = await check_plans(conn)
+            await conn.rollback()
+        return regressions
+    finally:
+        await engine.dispose()
+
+
+def test_hot_path_queries_are_index_driven_on_sqlite(tmp_path):
+    url = f"sqlite+aiosqlite:///{tmp_path / 'plans.db'}"
+    assert asyncio.run(_regressions(url)) == {}
+
+
+@pytest.mark.skipif(
+    not os.getenv("TEST_POSTGRES_URL"), reason="TEST_POSTGRES_URL not set",
+)
+def test_hot_path_queries_are_index_driven_on_postgresql():
+    assert asyncio.run(_regressions(os.environ["TEST_POSTGRES_URL"])) == {}
+
+
+@pytest.mark.parametrize(
+    ("plan", "expected"),
+    [
+        (["SEARCH busy_slots USING INDEX ix_busy_slots_doctor_start_end (doctor_id=? AND start_dt<?)"], True),
+        (["SEARCH availability_rules USING COVERING INDEX sqlite_autoindex_availability_rules_1 (doctor_id=?)"], True),
+        (["SCAN busy_slots USING INDEX ix_busy_slots_doctor_start_end"], False),
+        (["SCAN busy_slots"], False),
+        (["SEARCH busy_slots USING INDEX ix_busy_slots_doctor_id (start_dt<?)"], False),
+        (
+            [
+                "Index Scan using ix_busy_slots_doctor_start_end on busy_slots  (cost=0.15..8.17 rows=1 width=52)",
+                "  Index Cond: ((doctor_id = 1) AND (start_dt < '2026-01-05 19:00:00'::timestamp without time zone))",
+            ],
+            True,
+        ),
+        (
+            [
+                "Bitmap Heap Scan on availability_rules  (cost=4.18..12.64 rows=4 width=24)",
+                "  Recheck Cond: (doctor_id = 1)",
+                "  ->  Bitmap Index Scan on uq_availability_rules_doctor_id_weekday_start_time_end_time  (cost=0.00..4.18 rows=4 width=0)",
+                "        Index Cond: (doctor_id = 1)",
+            ],
+            True,
+        ),
+        (
+            [
+                "Index Scan using ix_busy_slots_doctor_start_end on busy_slots  (cost=0.15..40.17 rows=1 width=52)",
+                "  Filter: (doctor_id = 1)",
+            ],
+            False,
+        ),
+        (["Seq Scan on busy_slots  (cost=10000000000.00..10000000001.01 rows=1 width=52)"], False),
+    ],
+)
+def test_is_index_driven_requires_an_index_condition(plan, expected):
+    assert is_index_driven(plan, "doctor_id") is expected
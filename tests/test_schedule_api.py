@@ -0,0 +1,61 @@
+"""Schedule read endpoints, served in-process over ASGI."""
+
+from datetime import datetime, timedelta
+
+import httpx
+from fastapi import FastAPI
+
+from app.api.controllers.schedule_controller import router
+from app.db.models import BusySlot, Doctor
+from app.db.retention import archive_busy_slots
+from app.db.session import async_session
+
+api = FastAPI()
+api.include_router(router)
+
+
+async def _get(path: str, **params) -> dict:
+    transport = httpx.ASGITransport(app=api)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get(path, params=params)
+    response.raise_for_status()
+    return response.json()
+
+
+def test_busy_slots_include_archived_ones_for_old_ranges(run_on_fresh_db):
+    now = datetime.now().replace(microsecond=0)
+    old = now - timedelta(days=60)
+
+    async def scenario():
+        async with async_session() as db:
+            db.add(Doctor(id=1, name="Dra. Ana", phone="+5511900000001"))
+            await db.flush()
+            db.add_all([
+                BusySlot(doctor_id=1, start_dt=old, end_dt=old + timedelta(hours=4), reason="old"),
+                BusySlot(doctor_id=1, start_dt=now, end_dt=now + timedelta(hours=4), reason="new"),
+            ])
+            await db.commit()
+        assert await archive_busy_slots(retention_days=30) == 1
+
+        end = (now + timedelta(days=1)).isoformat()
+        pages, cursor = [], None
+        while True:
+            paging = {"cursor": cursor} if cursor else {}
+            page = await _get(
+                "/schedule/doctor/1/busy",
+                start=(old - timedelta(days=1)).isoformat(), end=end, limit=1, **paging,
+            )
+            pages.append(page["items"])
+            if (cursor := page["next_cursor"]) is None:
+                break
+        recent = await _get(
+            "/schedule/doctor/1/busy", start=(now - timedelta(hours=1)).isoformat(), end=end,
+        )
+        return pages, recent["items"]
+
+    pages, recent = run_on_fresh_db(scenario)
+    assert [[(item["reason"], item["archived"]) for item in page] for page in pages] == [
+        [("old", True)],
+        [("new", False)],
+    ]
+    assert [item["reason"] for item in recent] == ["new"]
@@ -0,0 +1,135 @@
+"""check_shifts against a temporary SQLite database (multi-day shifts)."""
+
+from datetime import date, datetime, time
+
+import pytest
+
+from app.ai.schemas import ShiftCandidate
+from app.ai.tools.schedule_tool import check_shifts
+from app.db.models import AvailabilityRule, BusySlot, Doctor, RecurringBusyRule
+from app.db.session import async_session
+
+MON, TUE, WED, THU, FRI, SAT, SUN = range(7)
+MIDNIGHT = time(0)
+
+
+def _check(run_on_fresh_db, candidates, availability=(), recurring=(), busy=()):
+    """Store one doctor's schedule and check *candidates*; return (ok, reason) pairs."""
+
+    async def scenario():
+        async with async_session() as db:
+            db.add(Doctor(id=1, name="Dra. Ana", phone="+5511900000001"))
+            await db.flush()
+            db.add_all(
+                AvailabilityRule(doctor_id=1, weekday=w, start_time=s, end_time=e)
+                for w, s, e in availability
+            )
+            db.add_all(
+                RecurringBusyRule(doctor_id=1, weekday=w, start_time=s, end_time=e, label=label)
+                for w, s, e, label in recurring
+            )
+            db.add_all(
+                BusySlot(doctor_id=1, start_dt=s, end_dt=e, reason=reason)
+                for s, e, reason in busy
+            )
+            await db.commit()
+        async with async_session() as db:
+            return await check_shifts(db, 1, candidates)
+
+    return [(v.ok, v.reason) for v in run_on_fresh_db(scenario)]
+
+
+def _shift(day: int, start: time, hours: int) -> ShiftCandidate:
+    # 2026-01-05 is a Monday
+    return ShiftCandidate(
+        date=date(2026, 1, 5 + day), shift_type="diurno", start_time=start, duration_hours=hours,
+    )
+
+
+def test_overnight_shift_needs_the_wrapping_rule(run_on_fresh_db):
+    night = _shift(MON, time(19), 12)
+    assert _check(run_on_fresh_db, [night], availability=[(MON, time(19), time(7))]) == [
+        (True, None),
+    ]
+    assert _check(
+        run_on_fresh_db,
+        [night],
+        availability=[(MON, time(7), time(19)), (MON, time(19), MIDNIGHT)],
+    ) == [(False, "no availability rule for Tue 06/01")]
+
+
+def test_24h_shift_is_covered_by_a_full_day_rule_and_hits_its_lunch(run_on_fresh_db):
+    day = _shift(WED, time(7), 24)
+    full_day = [(WED, time(7), time(7))]
+    assert _check(run_on_fresh_db, [day], availability=full_day) == [(True, None)]
+    assert _check(
+        run_on_fresh_db,
+        [day],
+        availability=full_day,
+        recurring=[(THU, time(6), time(8), "Ambulatório")],
+    ) == [(False, "conflicts with recurring block: Ambulatório (Thu 08/01 00:00–07:00)")]
+
+
+def test_friday_to_sunday_shift_is_judged_per_day(run_on_fresh_db):
+    weekend = _shift(FRI, time(19), 36)
+    availability = [
+        (FRI, time(19), MIDNIGHT),
+        (SAT, MIDNIGHT, MIDNIGHT),
+        (SUN, MIDNIGHT, time(7)),
+    ]
+    assert _check(run_on_fresh_db, [weekend], availability=availability) == [(True, None)]
+    assert _check(run_on_fresh_db, [weekend], availability=availability[::2]) == [
+        (False, "no availability rule for Sat 10/01"),
+    ]
+    assert _check(
+        run_on_fresh_db, [weekend], availability=[*availability[:2], (SUN, MIDNIGHT, time(6))],
+    ) == [(False, "shift outside availability window (Sun 11/01 00:00–07:00)")]
+
+
+def test_sunday_to_monday_shift_wraps_the_week(run_on_fresh_db):
+    night = _shift(SUN, time(19), 12)
+    sunday_night = [(SUN, time(19), time(7))]
+    assert _check(run_on_fresh_db, [night], availability=sunday_night) == [(True, None)]
+    assert _check(
+        run_on_fresh_db,
+        [night],
+        availability=sunday_night,
+        recurring=[(MON, time(6), time(8), "Visita")],
+    ) == [(False, "conflicts with recurring block: Visita (Mon 12/01 00:00–07:00)")]
+
+
+@pytest.mark.parametrize(
+    ("slot_start", "slot_end", "expected"),
+    [
+        (
+            datetime(2026, 1, 6, 6),
+            datetime(2026, 1, 6, 9),
+            (False, "conflicts with busy slot: Cirurgia"),
+        ),
+        (datetime(2026, 1, 6, 7), datetime(2026, 1, 6, 9), (True, None)),
+    ],
+)
+def test_busy_slot_on_the_second_day_of_an_overnight_shift(
+    run_on_fresh_db, slot_start, slot_end, expected,
+):
+    night = _shift(MON, time(19), 12)
+    assert _check(
+        run_on_fresh_db,
+        [night],
+        availability=[(MON, time(19), time(7))],
+        busy=[(slot_start, slot_end, "Cirurgia")],
+    ) == [expected]
+
+
+def test_candidates_are_checked_together(run_on_fresh_db):
+    results = _check(
+        run_on_fresh_db,
+        [_shift(MON, time(7), 12), _shift(TUE, time(7), 12), _shift(SUN, time(19), 12)],
+        availability=[(MON, time(7), time(19)), (SUN, time(19), time(7))],
+        busy=[(datetime(2026, 1, 5, 12), datetime(2026, 1, 5, 13), None)],
+    )
+    assert results == [
+        (False, "conflicts with busy slot: busy"),
+        (False, "no availability rule for Tue 06/01"),
+        (True, None),
+    ]
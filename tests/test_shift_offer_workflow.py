@@ -0,0 +1,39 @@
+"""The shift-offer workflow must not hold a DB connection during LLM calls."""
+
+from datetime import date, time
+
+from app.ai.schemas import ActionType, DecisionOut, OfferExtraction, ShiftCandidate
+from app.ai.workflows import shift_offer_workflow as workflow
+from app.db.models import AvailabilityRule, Doctor
+from app.db.session import async_session
+
+
+def test_read_session_is_released_before_the_decision_call(run_on_fresh_db, monkeypatch):
+    seen: dict[str, object] = {}
+
+    async def extract(_text: str) -> OfferExtraction:
+        shift = ShiftCandidate(date=date(2026, 1, 5), shift_type="diurno", start_time=time(7))
+        return OfferExtraction(is_offer=True, shifts=[shift])
+
+    async def decide(_extraction, validations) -> DecisionOut:
+        seen["in_transaction"] = seen.pop("session").in_transaction()
+        return DecisionOut(action=ActionType.ACCEPT, reply_text="Aceito!", validations=validations)
+
+    monkeypatch.setattr(workflow, "run_offer_extraction", extract)
+    monkeypatch.setattr(workflow, "run_decision", decide)
+
+    async def scenario():
+        async with async_session() as setup:
+            setup.add(Doctor(id=1, name="Dra. Ana", phone="+5511900000001"))
+            await setup.flush()
+            setup.add(AvailabilityRule(
+                doctor_id=1, weekday=0, start_time=time(7), end_time=time(19),
+            ))
+            await setup.commit()
+        async with async_session() as db:
+            seen["session"] = db
+            return await workflow.shift_offer_workflow(db, 1, "Plantão segunda 05/01?")
+
+    decision = run_on_fresh_db(scenario)
+    assert [v.ok for v in decision.validations] == [True]
+    assert seen == {"in_transaction": False}